@@ -2,13 +2,168 @@
 
 import argparse
 import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from concurrent.futures.process import BrokenProcessPool
 
+from image_processing import image_utils
+from image_processing.hashing import HashIndex, hash_file
 from image_processing.image_utils import ImageProcessor
 from rich.console import Console
 from rich.progress import Progress
 
 console = Console()
 
+DEFAULT_DEDUPE_DISTANCE = 6
+DEFAULT_WORKERS = os.cpu_count() or 1
+# Jobs kept in flight per worker: enough to never leave one idle, few enough
+# that a broken pool only takes a handful of files down with it.
+POOL_WINDOW = 2
+
+
+def _quiet_worker():
+    """Silences per-image logging in pool workers, which would garble the progress bar."""
+    image_utils.console.quiet = True
+
+
+def _try_hash(path):
+    try:
+        return hash_file(path), None
+    except Exception as e:
+        return None, e
+
+
+def find_duplicates(input_dir, image_files, max_distance=DEFAULT_DEDUPE_DISTANCE, executor=None):
+    """
+    Maps each image that is a near-duplicate of an earlier one to that image.
+
+    Images are compared by 64-bit perceptual hash, computed from a small
+    decoded thumbnail, so this costs far less than processing them. Given an
+    executor, hashes are computed on it; matching still runs in file order.
+    """
+    paths = [os.path.join(input_dir, filename) for filename in image_files]
+    hashes = executor.map(_try_hash, paths, chunksize=16) if executor else map(_try_hash, paths)
+    index = HashIndex()
+    duplicates = {}
+    for filename, (hash_value, error) in zip(image_files, hashes):
+        if error is not None:
+            console.print(f"[yellow]Could not hash '{filename}': {error}[/yellow]")
+            continue
+        match = index.nearest(hash_value, max_distance)
+        if match is None:
+            index.add(hash_value, filename)
+        else:
+            duplicates[filename] = match[2]
+    return duplicates
+
+
+def optimize_image(input_path, output_path, options):
+    """
+    Resizes, filters and saves one image as options (the parsed arguments) ask.
+
+    Returns the path written and the estimated peak memory in bytes. Runs in
+    a pool worker when --workers is above one, so it must stay module-level.
+    """
+    processor = ImageProcessor(
+        input_path,
+        lazy=True,
+        memory_limit=options.memory_limit * 2**20 if options.memory_limit else None,
+    )
+    processor.resize(max_size=(options.max_width, options.max_height))
+
+    if options.grayscale:
+        processor.apply_grayscale()
+    if options.sepia:
+        processor.apply_sepia()
+    if options.watermark:
+        processor.add_watermark(options.watermark)
+
+    if options.format:
+        base, _ = os.path.splitext(output_path)
+        output_path = f"{base}.{options.format.lower()}"
+        processor.convert_format(output_path, format=options.format)
+    else:
+        processor.save(output_path, quality=options.quality)
+    return output_path, processor.peak_memory
+
+
+def _run_inline(jobs):
+    """Yields (filename, result, error) for each job, processed one at a time."""
+    for filename, input_path, output_path, options in jobs:
+        try:
+            yield filename, optimize_image(input_path, output_path, options), None
+        except Exception as e:
+            yield filename, None, e
+
+
+def _new_pool(workers):
+    return ProcessPoolExecutor(max_workers=workers, initializer=_quiet_worker)
+
+
+def _drain(executor, pending, window):
+    """
+    Feeds pending jobs to executor, at most window at a time, yielding each
+    (filename, result, error) as it finishes. Stops submitting once the pool
+    breaks and returns the jobs that were lost with it.
+    """
+    in_flight = {}
+    lost = []
+    broken = False
+    while True:
+        while pending and not broken and len(in_flight) < window:
+            job = pending.popleft()
+            try:
+                in_flight[executor.submit(optimize_image, *job[1:])] = job
+            except BrokenProcessPool:
+                pending.appendleft(job)
+                broken = True
+        if not in_flight:
+            return lost
+        done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+        for future in done:
+            job = in_flight.pop(future)
+            try:
+                yield job[0], future.result(), None
+            except BrokenProcessPool:
+                broken = True
+                lost.append(job)
+            except Exception as e:
+                yield job[0], None, e
+
+
+def _run_isolated(job):
+    """Runs one job alone in a fresh single-worker pool, so a crash is its own."""
+    executor = _new_pool(1)
+    try:
+        return job[0], executor.submit(optimize_image, *job[1:]).result(), None
+    except BrokenProcessPool:
+        return job[0], None, RuntimeError("worker process died (out of memory?)")
+    except Exception as e:
+        return job[0], None, e
+    finally:
+        executor.shutdown(cancel_futures=True)
+
+
+def _run_pooled(workers, jobs):
+    """
+    Yields (filename, result, error) for each job as pool workers finish it.
+
+    Only workers * POOL_WINDOW jobs are submitted at a time. If a worker process
+    dies (killed for running out of memory, say), the pool fails every job in
+    flight; those are retried one by one in isolation, so only a file that
+    kills its worker again is reported failed, and the rest of the batch goes
+    on in a fresh pool.
+    """
+    pending = deque(jobs)
+    while pending:
+        executor = _new_pool(workers)
+        try:
+            lost = yield from _drain(executor, pending, workers * POOL_WINDOW)
+        finally:
+            executor.shutdown(cancel_futures=True)
+        for job in lost:
+            yield _run_isolated(job)
+
 
 def process_images(args):
     """Processes all images in a folder based on the provided arguments."""
@@ -23,44 +178,54 @@ def process_images(args):
         for f in os.listdir(args.input)
         if f.lower().endswith((".png", ".jpg", ".jpeg", ".gif", ".bmp"))
     ]
+    workers = max(1, min(args.workers or DEFAULT_WORKERS, len(image_files)))
+    failures = []
 
-    with Progress(console=console) as progress:
-        task = progress.add_task("[green]Optimizing images...[/green]", total=len(image_files))
-        for filename in image_files:
-            input_path = os.path.join(args.input, filename)
-            output_path = os.path.join(args.output, filename)
+    if args.dedupe:
+        executor = _new_pool(workers) if workers > 1 else None
+        try:
+            duplicates = find_duplicates(
+                args.input, image_files, args.dedupe_distance, executor
+            )
+        finally:
+            if executor:
+                executor.shutdown()
+        for filename, original in duplicates.items():
+            console.print(
+                f"[yellow]'{filename}'[/yellow] is a near-duplicate of [cyan]'{original}'[/cyan]"
+            )
+        console.print(f"[bold green]Found {len(duplicates)} near-duplicate images.[/bold green]")
+        if args.dedupe == "skip":
+            image_files = [f for f in image_files if f not in duplicates]
 
-            try:
-                processor = ImageProcessor(input_path)
-                processor.resize(max_size=(args.max_width, args.max_height))
-
-                if args.grayscale:
-                    processor.apply_grayscale()
-                if args.sepia:
-                    processor.apply_sepia()
-                if args.watermark:
-                    processor.add_watermark(args.watermark)
-
-                if args.format:
-                    base, _ = os.path.splitext(output_path)
-                    output_path = f"{base}.{args.format.lower()}"
-                    processor.convert_format(output_path, format=args.format)
-                else:
-                    processor.save(output_path, quality=args.quality)
+    jobs = [
+        (filename, os.path.join(args.input, filename), os.path.join(args.output, filename), args)
+        for filename in image_files
+    ]
+    results = _run_pooled(workers, jobs) if workers > 1 else _run_inline(jobs)
 
-                progress.update(
-                    task,
-                    advance=1,
-                    description=f"[green]Processed[/green] [yellow]'{filename}'[/yellow]",
-                )
-            except Exception as e:
-                progress.update(
-                    task,
-                    advance=1,
-                    description=f"[red]Failed[/red] [yellow]'{filename}': {e}[/yellow]",
-                )
+    try:
+        with Progress(console=console) as progress:
+            task = progress.add_task("[green]Optimizing images...[/green]", total=len(jobs))
+            for filename, result, error in results:
+                if error is None:
+                    description = (
+                        f"[green]Processed[/green] [yellow]'{filename}'[/yellow] "
+                        f"(peak ~{result[1] / 2**20:.0f} MiB)"
+                    )
+                else:
+                    failures.append((filename, error))
+                    description = f"[red]Failed[/red] [yellow]'{filename}': {error}[/yellow]"
+                progress.update(task, advance=1, description=description)
+    finally:
+        results.close()  # Shuts the pool down if the loop was interrupted.
 
+    if failures:
+        console.print(f"[bold red]Failed to process {len(failures)} images:[/bold red]")
+        for filename, error in failures:
+            console.print(f"  [yellow]'{filename}'[/yellow]: {error}")
     console.print("[bold green]Image processing complete![/bold green]")
+    return failures
 
 
 def main():
@@ -78,6 +243,33 @@ def main():
     parser.add_argument("--grayscale", action="store_true", help="Apply grayscale filter.")
     parser.add_argument("--sepia", action="store_true", help="Apply sepia filter.")
     parser.add_argument("--watermark", type=str, help="Add a text watermark to the images.")
+    parser.add_argument(
+        "--memory-limit",
+        type=int,
+        help="Per-image memory ceiling in MiB; filters run in strips to stay under it.",
+    )
+
+    parser.add_argument(
+        "--dedupe",
+        choices=("skip", "report"),
+        help="Detect near-duplicate images first and skip or just report them.",
+    )
+    parser.add_argument(
+        "--dedupe-distance",
+        type=int,
+        default=DEFAULT_DEDUPE_DISTANCE,
+        help="Maximum perceptual-hash bit difference (of 64) for a near-duplicate.",
+    )
+
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_WORKERS,
+        help=(
+            "Worker processes to run images on (default: CPU count). "
+            "Each may use up to --memory-limit."
+        ),
+    )
 
     args = parser.parse_args()
     process_images(args)
@@ -2,10 +2,22 @@
 
 import unittest
 import os
-from PIL import Image
+from unittest import mock
+from PIL import Image, ImageFilter
+from image_optimizer import main
 from image_optimizer.main import process_images
 import argparse
 
+_optimize_image = main.optimize_image
+
+
+def _optimize_or_die(input_path, output_path, options):
+    """Stands in for optimize_image; kills its worker on "crash" files, like an OOM kill."""
+    if "crash" in os.path.basename(input_path):
+        os._exit(1)
+    return _optimize_image(input_path, output_path, options)
+
+
 class TestImageOptimizer(unittest.TestCase):
 
     def setUp(self):
@@ -36,7 +48,11 @@ class TestImageOptimizer(unittest.TestCase):
             format=None,
             grayscale=False,
             sepia=False,
-            watermark=None
+            watermark=None,
+            memory_limit=None,
+            dedupe=None,
+            dedupe_distance=6,
+            workers=1
         )
         process_images(args)
         
@@ -45,5 +61,92 @@ class TestImageOptimizer(unittest.TestCase):
         with Image.open(output_path) as img:
             self.assertEqual(img.size, (100, 100))
 
+    def test_process_images_skips_near_duplicates(self):
+        img = Image.merge("RGB", [
+            Image.effect_noise((256, 256), 80).filter(ImageFilter.GaussianBlur(12))
+            for _ in range(3)
+        ])
+        img.save(os.path.join(self.input_dir, "original.png"))
+        img.resize((128, 128)).save(os.path.join(self.input_dir, "smaller_copy.jpg"))
+        args = argparse.Namespace(
+            input=self.input_dir,
+            output=self.output_dir,
+            max_width=100,
+            max_height=100,
+            quality=90,
+            format=None,
+            grayscale=False,
+            sepia=False,
+            watermark=None,
+            memory_limit=None,
+            dedupe="skip",
+            dedupe_distance=6,
+            workers=1
+        )
+        process_images(args)
+
+        outputs = sorted(os.listdir(self.output_dir))
+        self.assertEqual(len(outputs), 2)
+        self.assertIn(self.test_image, outputs)
+
+    def test_process_images_in_worker_pool_collects_failures(self):
+        for index in range(3):
+            Image.new('RGB', (200, 200), color=(index * 80, 0, 0)).save(
+                os.path.join(self.input_dir, f"red_{index}.png")
+            )
+        with open(os.path.join(self.input_dir, "broken.jpg"), "wb") as f:
+            f.write(b"not an image")
+        args = argparse.Namespace(
+            input=self.input_dir,
+            output=self.output_dir,
+            max_width=100,
+            max_height=100,
+            quality=90,
+            format=None,
+            grayscale=True,
+            sepia=False,
+            watermark=None,
+            memory_limit=None,
+            dedupe=None,
+            dedupe_distance=6,
+            workers=2
+        )
+        failures = process_images(args)
+
+        self.assertEqual([filename for filename, _ in failures], ["broken.jpg"])
+        outputs = sorted(os.listdir(self.output_dir))
+        self.assertEqual(outputs, ["red_0.png", "red_1.png", "red_2.png", self.test_image])
+        with Image.open(os.path.join(self.output_dir, "red_1.png")) as img:
+            self.assertEqual((img.mode, img.size), ("L", (100, 100)))
+
+    def test_worker_crash_fails_only_its_own_file(self):
+        for index in range(6):
+            Image.new('RGB', (200, 200), color=(0, index * 40, 0)).save(
+                os.path.join(self.input_dir, f"green_{index}.png")
+            )
+        Image.new('RGB', (200, 200)).save(os.path.join(self.input_dir, "crash.png"))
+        args = argparse.Namespace(
+            input=self.input_dir,
+            output=self.output_dir,
+            max_width=100,
+            max_height=100,
+            quality=90,
+            format=None,
+            grayscale=False,
+            sepia=False,
+            watermark=None,
+            memory_limit=None,
+            dedupe=None,
+            dedupe_distance=6,
+            workers=2
+        )
+        # Pool workers are forked, so they see the patched module too.
+        with mock.patch.object(main, "optimize_image", _optimize_or_die):
+            failures = process_images(args)
+
+        self.assertEqual([filename for filename, _ in failures], ["crash.png"])
+        outputs = sorted(os.listdir(self.output_dir))
+        self.assertEqual(outputs, [f"green_{i}.png" for i in range(6)] + [self.test_image])
+
 if __name__ == '__main__':
     unittest.main()
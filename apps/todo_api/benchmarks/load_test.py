@@ -0,0 +1,293 @@
+# apps/todo_api/benchmarks/load_test.py
+
+"""
+Load-tests the To-Do API end to end on one machine.
+
+Starts uvicorn against a fresh SQLite file in a temporary directory, seeds it
+through the bulk endpoint, then drives a weighted mix of reads and writes from
+a fixed number of concurrent clients and prints throughput and latency
+percentiles as JSON. Run from the monorepo root:
+
+    python apps/todo_api/benchmarks/load_test.py --tasks 10000 --concurrency 16 \\
+        --duration 20 --output before.json
+
+The client shares the CPU with the server, so compare results from the same
+machine and settings only.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import platform
+import random
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+from rich.console import Console
+
+console = Console(stderr=True)
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+MONOREPO_ROOT = APP_ROOT.parents[1]
+PYTHONPATH = [APP_ROOT / "src", MONOREPO_ROOT / "libs" / "database_utils" / "src"]
+
+SEED_BATCH_SIZE = 5000
+DEFAULT_MIX = "list=50,get=30,create=10,update=10"
+PERCENTILES = (50, 95, 99)
+WORDS = (
+    "alpha", "bravo", "charlie", "delta", "echo", "foxtrot", "golf", "hotel",
+    "india", "juliet", "kilo", "lima", "mike", "november", "oscar", "papa",
+)
+
+
+def parse_mix(text: str) -> dict:
+    """Parses "op=weight,..." into a weight per operation."""
+    mix = {}
+    for part in text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise argparse.ArgumentTypeError(
+                f"unknown operation {name!r}; choose from {', '.join(OPERATIONS)}"
+            )
+        mix[name] = float(weight)
+    if sum(mix.values()) <= 0:
+        raise argparse.ArgumentTypeError("the mix needs at least one positive weight")
+    return mix
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def start_server(workdir: str, port: int) -> subprocess.Popen:
+    """
+    Starts uvicorn in workdir, so the app's relative todo.db is created there.
+
+    The server's output goes to stderr so it never mixes with the JSON report.
+    """
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        [str(path) for path in PYTHONPATH] + [env.get("PYTHONPATH", "")]
+    )
+    return subprocess.Popen(
+        [
+            sys.executable, "-m", "uvicorn", "todo_api.main:app",
+            "--host", "127.0.0.1", "--port", str(port),
+            "--log-level", "warning", "--no-access-log",
+        ],
+        cwd=workdir,
+        env=env,
+        stdout=sys.stderr,
+    )
+
+
+async def wait_until_ready(client: httpx.AsyncClient, server, timeout=30.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if server.poll() is not None:
+            raise RuntimeError(f"server exited with code {server.returncode}")
+        try:
+            if (await client.get("/metrics")).status_code == 200:
+                return
+        except httpx.TransportError:
+            pass
+        await asyncio.sleep(0.1)
+    raise RuntimeError("server did not start in time")
+
+
+def make_task(rng: random.Random, n: int) -> dict:
+    return {
+        "title": f"Task {n} {rng.choice(WORDS)}",
+        "description": " ".join(rng.choices(WORDS, k=8)),
+        "completed": rng.random() < 0.3,
+    }
+
+
+async def seed(client: httpx.AsyncClient, count: int, rng: random.Random) -> list[int]:
+    """Creates count tasks through the bulk endpoint and returns their IDs."""
+    ids = []
+    for start in range(0, count, SEED_BATCH_SIZE):
+        batch = [make_task(rng, n) for n in range(start, min(count, start + SEED_BATCH_SIZE))]
+        response = await client.post("/tasks/bulk", json=batch)
+        response.raise_for_status()
+        ids.extend(task["id"] for task in response.json())
+    return ids
+
+
+async def op_list(client, rng, state):
+    after = rng.choice(state["ids"]) if state["ids"] else 0
+    return await client.get("/tasks/", params={"after": after, "limit": state["page_size"]})
+
+
+async def op_get(client, rng, state):
+    return await client.get(f"/tasks/{rng.choice(state['ids'])}")
+
+
+async def op_create(client, rng, state):
+    response = await client.post("/tasks/", json=make_task(rng, len(state["ids"])))
+    if response.status_code == 201:
+        state["ids"].append(response.json()["id"])
+    return response
+
+
+async def op_update(client, rng, state):
+    task = make_task(rng, 0)
+    return await client.put(f"/tasks/{rng.choice(state['ids'])}", json=task)
+
+
+async def op_search(client, rng, state):
+    return await client.get("/tasks/search", params={"q": rng.choice(WORDS)})
+
+
+OPERATIONS = {
+    "list": op_list,
+    "get": op_get,
+    "create": op_create,
+    "update": op_update,
+    "search": op_search,
+}
+
+
+async def worker(client, rng, mix, state, samples, stop_at, record_after):
+    names = list(mix)
+    weights = list(mix.values())
+    while True:
+        name = rng.choices(names, weights)[0]
+        started = time.perf_counter()
+        if started >= stop_at:
+            return
+        try:
+            response = await OPERATIONS[name](client, rng, state)
+            ok = response.status_code < 400
+        except httpx.HTTPError:
+            ok = False
+        finished = time.perf_counter()
+        if started >= record_after:
+            samples.append((name, finished - started, ok))
+
+
+def percentile(sorted_values: list, pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * pct // 100))
+    return sorted_values[int(rank) - 1]
+
+
+def summarize(samples: list, elapsed: float) -> dict:
+    latencies = sorted(latency for _, latency, _ in samples)
+    return {
+        "requests": len(samples),
+        "errors": sum(1 for _, _, ok in samples if not ok),
+        "requests_per_second": round(len(samples) / elapsed, 1) if elapsed else 0.0,
+        "latency_ms": {
+            **{f"p{p}": round(percentile(latencies, p) * 1000, 3) for p in PERCENTILES},
+            "mean": round(sum(latencies) / len(latencies) * 1000, 3) if latencies else 0.0,
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+def git_commit() -> str | None:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=MONOREPO_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def run_benchmark(args) -> dict:
+    rng = random.Random(args.seed)
+    with tempfile.TemporaryDirectory(prefix="todo-bench-") as workdir:
+        port = free_port()
+        server = start_server(workdir, port)
+        limits = httpx.Limits(max_connections=args.concurrency)
+        try:
+            async with httpx.AsyncClient(
+                base_url=f"http://127.0.0.1:{port}", limits=limits, timeout=30.0
+            ) as client:
+                await wait_until_ready(client, server)
+                console.log(f"[bold green]Seeding[/bold green] [cyan]{args.tasks}[/cyan] tasks")
+                state = {"ids": await seed(client, args.tasks, rng), "page_size": args.page_size}
+                console.log(
+                    f"[bold green]Running[/bold green] {args.concurrency} clients for "
+                    f"{args.warmup}s warm-up + {args.duration}s"
+                )
+                samples = []
+                record_after = time.perf_counter() + args.warmup
+                stop_at = record_after + args.duration
+                await asyncio.gather(*(
+                    worker(
+                        client, random.Random(args.seed + i + 1), args.mix,
+                        state, samples, stop_at, record_after,
+                    )
+                    for i in range(args.concurrency)
+                ))
+                elapsed = time.perf_counter() - record_after
+        finally:
+            server.terminate()
+            server.wait(timeout=10)
+
+    by_operation = {}
+    for name in args.mix:
+        by_operation[name] = summarize([s for s in samples if s[0] == name], elapsed)
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "config": {
+            "tasks": args.tasks,
+            "concurrency": args.concurrency,
+            "duration": args.duration,
+            "warmup": args.warmup,
+            "page_size": args.page_size,
+            "mix": args.mix,
+            "seed": args.seed,
+        },
+        "elapsed": round(elapsed, 3),
+        **summarize(samples, elapsed),
+        "operations": by_operation,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load-test the To-Do API locally.")
+    parser.add_argument("--tasks", type=int, default=10000, help="Tasks to seed (at least 1).")
+    parser.add_argument("--concurrency", type=int, default=16, help="Concurrent clients.")
+    parser.add_argument("--duration", type=float, default=10.0, help="Measured seconds.")
+    parser.add_argument("--warmup", type=float, default=2.0, help="Unmeasured seconds first.")
+    parser.add_argument("--page-size", type=int, default=100, help="Limit for list requests.")
+    parser.add_argument(
+        "--mix",
+        type=parse_mix,
+        default=parse_mix(DEFAULT_MIX),
+        help=f"Operation weights, from {', '.join(OPERATIONS)} (default: {DEFAULT_MIX}).",
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed for the workload.")
+    parser.add_argument("--output", help="Write the JSON report here instead of stdout.")
+    args = parser.parse_args()
+    # get and update pick an existing ID, and nothing in the mix deletes tasks.
+    if args.tasks < 1:
+        parser.error("--tasks must be at least 1")
+
+    report = asyncio.run(run_benchmark(args))
+    text = json.dumps(report, indent=2)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+        console.log(f"[bold green]Report written to[/bold green] [cyan]{args.output}[/cyan]")
+    else:
+        print(text)
+
+
+if __name__ == "__main__":
+    main()
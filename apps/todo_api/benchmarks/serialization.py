@@ -0,0 +1,93 @@
+# apps/todo_api/benchmarks/serialization.py
+
+"""
+Measures the per-row cost of serializing task lists.
+
+Compares FastAPI's response_model path (validate into Task models, then
+jsonable_encoder and json.dumps), the pydantic TypeAdapter path the list
+endpoints use by default, and the opt-in fast path (TODO_API_FAST_JSON=1).
+Rows come from an in-memory SQLite table as sqlite3.Row objects, as they do
+in the app. Run from the monorepo root:
+
+    python apps/todo_api/benchmarks/serialization.py --rows 1000
+"""
+
+import argparse
+import json
+import sqlite3
+import sys
+import timeit
+from pathlib import Path
+
+APP_ROOT = Path(__file__).resolve().parents[1]
+sys.path[:0] = [
+    str(APP_ROOT / "src"),
+    str(APP_ROOT.parents[1] / "libs" / "database_utils" / "src"),
+]
+
+from fastapi.encoders import jsonable_encoder  # noqa: E402
+
+from todo_api import serialization  # noqa: E402
+from todo_api.main import Task, TaskList, dump_task_rows  # noqa: E402
+
+
+def load_rows(count: int) -> list:
+    conn = sqlite3.connect(":memory:")
+    conn.row_factory = sqlite3.Row
+    conn.execute(
+        "CREATE TABLE tasks (id INTEGER PRIMARY KEY, title TEXT NOT NULL,"
+        " description TEXT, completed BOOLEAN NOT NULL DEFAULT 0)"
+    )
+    conn.executemany(
+        "INSERT INTO tasks (title, description, completed) VALUES (?, ?, ?)",
+        (
+            (f"Task {n}", None if n % 3 == 0 else f"Description for task {n}", n % 2)
+            for n in range(count)
+        ),
+    )
+    rows = conn.execute("SELECT id, title, description, completed FROM tasks").fetchall()
+    conn.close()
+    return rows
+
+
+def response_model(rows) -> bytes:
+    tasks = [Task.model_validate(dict(row)) for row in rows]
+    return json.dumps(jsonable_encoder(tasks)).encode()
+
+
+def pydantic(rows) -> bytes:
+    serialization.FAST_JSON = False
+    return dump_task_rows(rows)
+
+
+def fast(rows) -> bytes:
+    serialization.FAST_JSON = True
+    return dump_task_rows(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark task list serialization.")
+    parser.add_argument("--rows", type=int, default=1000, help="Rows per response.")
+    parser.add_argument("--repeat", type=int, default=5, help="Timing runs per path.")
+    args = parser.parse_args()
+
+    rows = load_rows(args.rows)
+    expected = TaskList.validate_json(pydantic(rows))
+    if TaskList.validate_json(fast(rows)) != expected:
+        raise SystemExit("fast path produced different tasks")
+
+    report = {"rows": args.rows, "orjson": serialization.orjson is not None, "ns_per_row": {}}
+    for fn in (response_model, pydantic, fast):
+        timer = timeit.Timer(lambda: fn(rows))
+        number, _ = timer.autorange()
+        best = min(timer.repeat(repeat=args.repeat, number=number)) / number
+        report["ns_per_row"][fn.__name__] = round(best / args.rows * 1e9, 1)
+    baseline = report["ns_per_row"]["response_model"]
+    report["speedup"] = {
+        name: round(baseline / cost, 2) for name, cost in report["ns_per_row"].items()
+    }
+    print(json.dumps(report, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,211 @@
+# apps/todo_api/src/todo_api/changes.py
+
+import asyncio
+
+from rich.console import Console
+
+console = Console()
+
+CHANGE_TABLE = "task_changes"
+CHANGE_FIELDS = ("seq", "op", "task_id", "title", "description", "completed")
+DEFAULT_QUEUE_SIZE = 1000
+DEFAULT_POLL_INTERVAL = 1.0
+DEFAULT_HEARTBEAT = 15.0
+DEFAULT_RETENTION = 100000
+DEFAULT_PRUNE_PERIOD = 60.0
+READ_CHUNK_SIZE = 1000
+PRUNE_INTERVAL = 10000
+
+READ_CHANGES = (
+    f"SELECT {', '.join(CHANGE_FIELDS)} FROM {CHANGE_TABLE} WHERE seq > ? ORDER BY seq LIMIT ?"
+)
+LATEST_SEQ = f"SELECT COALESCE(MAX(seq), 0) FROM {CHANGE_TABLE}"
+PRUNE_CHANGES = f"DELETE FROM {CHANGE_TABLE} WHERE seq <= ?"
+
+
+def read_changes(db, after: int, limit: int) -> list:
+    """Reads change-log tuples after a sequence number, bypassing the result cache."""
+    return list(db.iter_rows(READ_CHANGES, (after, limit), row_type="tuple"))
+
+
+def latest_seq(db) -> int:
+    """Returns the newest sequence number in the change log (0 when empty)."""
+    return next(db.iter_rows(LATEST_SEQ, row_type="tuple"))[0]
+
+
+class Subscriber:
+    __slots__ = ("queue", "lagged")
+
+    def __init__(self, queue_size):
+        self.queue = asyncio.Queue(queue_size)
+        self.lagged = False
+
+
+class ChangeFeed:
+    """
+    Fans task changes out to any number of streaming subscribers.
+
+    Triggers record every write to the tasks table in the change log. A single
+    pump reads new entries once per wakeup and hands them to every subscriber's
+    bounded queue with put_nowait, so neither writes nor the pump ever wait on a
+    slow client. A subscriber whose queue fills up is marked lagged and catches
+    up from the change log itself. Write handlers call notify() to wake the pump.
+    The pump also polls, so writes made by other processes show up too.
+
+    The change log keeps the newest `retention` entries. Pruning runs from
+    maintain(), independently of subscribers, since triggers log every write
+    whether or not anyone is listening.
+
+    get_db returns the AsyncDatabase to read from. The pump only runs while
+    someone is subscribed; subscriptions are counted from entry to exit, so a
+    lagged subscriber catching up (and briefly off the fan-out set) still keeps
+    it running.
+    """
+
+    def __init__(
+        self,
+        get_db,
+        queue_size=DEFAULT_QUEUE_SIZE,
+        poll_interval=DEFAULT_POLL_INTERVAL,
+        heartbeat=DEFAULT_HEARTBEAT,
+        retention=DEFAULT_RETENTION,
+    ):
+        self.get_db = get_db
+        self.queue_size = queue_size
+        self.poll_interval = poll_interval
+        self.heartbeat = heartbeat
+        self.retention = retention
+        self.last_seq = None
+        self._subscribers = set()
+        self._active = 0
+        self._pump = None
+        self._loop = None
+        self._wakeup = None
+        self._pruned_through = 0
+
+    def notify(self):
+        """Wakes the pump after a write; cheap and safe to call from any thread."""
+        loop = self._loop
+        if loop is None:
+            return
+        try:
+            running = asyncio.get_running_loop()
+        except RuntimeError:
+            running = None
+        try:
+            if running is loop:
+                self._wakeup.set()
+            else:
+                loop.call_soon_threadsafe(self._wakeup.set)
+        except RuntimeError:
+            pass  # The pump's loop has already shut down.
+
+    async def _start(self):
+        if self._pump is not None and not self._pump.done():
+            return
+        seq = await self.get_db().run(latest_seq)
+        if self._pump is not None and not self._pump.done():
+            return  # Another subscriber started it while we were reading.
+        self.last_seq = seq
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        self._pump = asyncio.create_task(self._run())
+
+    def _stop(self):
+        if self._pump is not None:
+            self._pump.cancel()
+        self._pump = self._loop = self._wakeup = None
+
+    async def _run(self):
+        while True:
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), self.poll_interval)
+            except asyncio.TimeoutError:
+                pass
+            self._wakeup.clear()
+            try:
+                await self._deliver()
+            except Exception as e:
+                console.log(f"[bold red]Change feed pump failed:[/bold red] {e}")
+
+    async def _deliver(self):
+        db = self.get_db()
+        while True:
+            rows = await db.run(read_changes, self.last_seq, READ_CHUNK_SIZE)
+            if not rows:
+                return
+            self.last_seq = rows[-1][0]
+            for subscriber in list(self._subscribers):
+                put = subscriber.queue.put_nowait
+                try:
+                    for row in rows:
+                        put(row)
+                except asyncio.QueueFull:
+                    subscriber.lagged = True
+                    self._subscribers.discard(subscriber)
+
+    async def prune(self):
+        """Deletes all but the newest `retention` change-log entries, in batches."""
+        db = self.get_db()
+        newest = await db.run(latest_seq)
+        if newest - self._pruned_through < self.retention + PRUNE_INTERVAL:
+            return
+        cutoff = newest - self.retention
+        await db.execute_query(PRUNE_CHANGES, (cutoff,))
+        self._pruned_through = cutoff
+
+    async def maintain(self, period=DEFAULT_PRUNE_PERIOD):
+        """Prunes the change log every period seconds until cancelled."""
+        while True:
+            try:
+                await self.prune()
+            except Exception as e:
+                console.log(f"[bold red]Change log pruning failed:[/bold red] {e}")
+            await asyncio.sleep(period)
+
+    async def subscribe(self, since: int | None = None):
+        """
+        Yields change-log tuples with seq greater than since, forever.
+
+        With since=None only changes made from now on are yielded. If entries
+        after since have been pruned, a ("reset", seq) pair is yielded first:
+        the client missed changes and should reload, then resume from seq. The
+        same happens if a lagging subscriber falls behind the retention window.
+        None is yielded whenever nothing happened for a heartbeat interval.
+        """
+        self._active += 1
+        subscriber = None
+        try:
+            await self._start()
+            if since is None:
+                since = self.last_seq
+            while True:
+                subscriber = Subscriber(self.queue_size)
+                self._subscribers.add(subscriber)
+                # Registered first, so the queue covers whatever catch-up misses.
+                db = self.get_db()
+                while True:
+                    rows = await db.run(read_changes, since, READ_CHUNK_SIZE)
+                    if not rows:
+                        break
+                    # Sequence numbers are contiguous, so a jump on any pass
+                    # (first subscribe or after lagging) means entries were pruned.
+                    if rows[0][0] > since + 1:
+                        yield ("reset", rows[0][0] - 1)
+                    for row in rows:
+                        yield row
+                    since = rows[-1][0]
+                while not subscriber.lagged:
+                    try:
+                        row = await asyncio.wait_for(subscriber.queue.get(), self.heartbeat)
+                    except asyncio.TimeoutError:
+                        yield None
+                        continue
+                    if row[0] > since:
+                        since = row[0]
+                        yield row
+        finally:
+            self._subscribers.discard(subscriber)
+            self._active -= 1
+            if not self._active:
+                self._stop()
@@ -1,23 +1,129 @@
 # apps/todo_api/src/todo_api/database.py
 
+from database_utils.async_db import AsyncDatabase
 from database_utils.db_connector import DatabaseManager
+from database_utils.migrations import Migration, apply_migrations, create_index_sql
+from database_utils.result_cache import ResultCache
+
+from .changes import CHANGE_TABLE
+from .metrics import record_db_time
+from .response_cache import response_cache
 
 DATABASE_FILE = "todo.db"
 TABLE_NAME = "tasks"
+TASK_COLUMNS = ("title", "description", "completed")
 TABLE_SCHEMA = """
     id INTEGER PRIMARY KEY AUTOINCREMENT,
     title TEXT NOT NULL,
     description TEXT,
     completed BOOLEAN NOT NULL DEFAULT 0
 """
+TABLE_INDEXES = {
+    "idx_tasks_completed": ("completed",),
+}
+SEARCH_TABLE = "tasks_fts"
+SEARCH_SCHEMA = [
+    f"""CREATE VIRTUAL TABLE IF NOT EXISTS {SEARCH_TABLE} USING fts5(
+        title, description, content='{TABLE_NAME}', content_rowid='id',
+        tokenize='unicode61 remove_diacritics 2', prefix='2 3'
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_insert AFTER INSERT ON {TABLE_NAME} BEGIN
+        INSERT INTO {SEARCH_TABLE} (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_delete AFTER DELETE ON {TABLE_NAME} BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {SEARCH_TABLE}_update
+    AFTER UPDATE OF title, description ON {TABLE_NAME} BEGIN
+        INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}, rowid, title, description)
+        VALUES ('delete', old.id, old.title, old.description);
+        INSERT INTO {SEARCH_TABLE} (rowid, title, description)
+        VALUES (new.id, new.title, new.description);
+    END""",
+    f"INSERT INTO {SEARCH_TABLE} ({SEARCH_TABLE}) VALUES ('rebuild')",
+]
+CHANGE_LOG_SCHEMA = [
+    f"""CREATE TABLE IF NOT EXISTS {CHANGE_TABLE} (
+        seq INTEGER PRIMARY KEY AUTOINCREMENT,
+        op TEXT NOT NULL,
+        task_id INTEGER NOT NULL,
+        title TEXT,
+        description TEXT,
+        completed BOOLEAN
+    )""",
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_insert AFTER INSERT ON {TABLE_NAME} BEGIN
+        INSERT INTO {CHANGE_TABLE} (op, task_id, title, description, completed)
+        VALUES ('create', new.id, new.title, new.description, new.completed);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_update AFTER UPDATE ON {TABLE_NAME} BEGIN
+        INSERT INTO {CHANGE_TABLE} (op, task_id, title, description, completed)
+        VALUES ('update', new.id, new.title, new.description, new.completed);
+    END""",
+    f"""CREATE TRIGGER IF NOT EXISTS {CHANGE_TABLE}_delete AFTER DELETE ON {TABLE_NAME} BEGIN
+        INSERT INTO {CHANGE_TABLE} (op, task_id) VALUES ('delete', old.id);
+    END""",
+]
+
+MIGRATIONS = [
+    Migration(
+        1,
+        "Create the tasks table",
+        [f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({TABLE_SCHEMA})"],
+    ),
+    Migration(
+        2,
+        "Index tasks by completion state",
+        [
+            create_index_sql(TABLE_NAME, columns, index_name)
+            for index_name, columns in TABLE_INDEXES.items()
+        ],
+    ),
+    Migration(3, "Full-text index over task titles and descriptions", SEARCH_SCHEMA),
+    Migration(4, "Change log of task writes for the change feed", CHANGE_LOG_SCHEMA),
+]
+
+
+def bump_responses(table=None):
+    """Invalidates cached API responses after any write through this app's databases."""
+    response_cache.bump()
+
+
+result_cache = ResultCache(on_invalidate=bump_responses)
+_async_db = None
 
 
 def get_db():
-    """Returns a DatabaseManager instance for the To-Do app."""
-    return DatabaseManager(DATABASE_FILE)
+    """Returns a pooled, result-cached DatabaseManager instance for the To-Do app."""
+    return DatabaseManager(DATABASE_FILE, pooled=True, cache=result_cache)
+
+
+def get_async_db():
+    """Returns the shared AsyncDatabase the API handlers await on."""
+    global _async_db
+    if _async_db is None:
+        _async_db = AsyncDatabase(
+            DATABASE_FILE, cache=result_cache, observer=record_db_time
+        )
+    return _async_db
+
+
+def close_async_db():
+    """Shuts down the shared AsyncDatabase, if it was started."""
+    global _async_db
+    if _async_db is not None:
+        _async_db.close()
+        _async_db = None
+
+
+def initialize_database(db_path=None):
+    """Initializes the database by applying any pending schema migrations."""
+    with (get_db() if db_path is None else DatabaseManager(db_path)) as db:
+        apply_migrations(db, MIGRATIONS)
 
 
-def initialize_database():
-    """Initializes the database and creates the tasks table."""
-    with get_db() as db:
-        db.create_table(TABLE_NAME, TABLE_SCHEMA)
+def bulk_insert_tasks(tasks):
+    """Loads many (title, description, completed) rows with a single commit."""
+    with get_db() as db, db.transaction():
+        return db.bulk_insert(TABLE_NAME, TASK_COLUMNS, tasks)
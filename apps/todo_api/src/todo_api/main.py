@@ -1,16 +1,66 @@
 # apps/todo_api/src/todo_api/main.py
 
-from fastapi import FastAPI, HTTPException
-from pydantic import BaseModel
-from typing import List, Dict
+import asyncio
+import csv
+import io
+import json
+import re
+from contextlib import asynccontextmanager, suppress
+from urllib.parse import urlencode
+
+from fastapi import FastAPI, Header, HTTPException, Query, Request, Response
+from fastapi.responses import PlainTextResponse, StreamingResponse
+from pydantic import BaseModel, TypeAdapter
+from typing import List, Dict, Literal
+
+from . import serialization
+from .changes import ChangeFeed
+from .database import close_async_db, get_async_db, initialize_database
+from .metrics import CONTENT_TYPE as METRICS_CONTENT_TYPE, MetricsMiddleware, metrics
+from .response_cache import etag_matches, response_cache
+from .serialization import TASK_FIELDS, encode_task_rows
+
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+MAX_BULK_SIZE = 10000
+MAX_SEARCH_PAGE_SIZE = 100
+EXPORT_CHUNK_SIZE = 5000
+EXPORT_FIELDS = ("id", "title", "description", "completed")
+EXPORT_MEDIA_TYPES = {"ndjson": "application/x-ndjson", "csv": "text/csv"}
+SSE_RETRY_MS = 3000
+
+INSERT_TASK = "INSERT INTO tasks (title, description, completed) VALUES (?, ?, ?)"
+UPDATE_TASK = "UPDATE tasks SET title = ?, description = ?, completed = ? WHERE id = ?"
+DELETE_TASK = "DELETE FROM tasks WHERE id = ?"
+SEARCH_TASKS = """
+    SELECT tasks.id, tasks.title, tasks.description, tasks.completed
+    FROM tasks_fts JOIN tasks ON tasks.id = tasks_fts.rowid
+    WHERE tasks_fts MATCH ? ORDER BY bm25(tasks_fts, 10.0, 1.0) LIMIT ? OFFSET ?
+"""
+EXPORT_CHUNK = (
+    "SELECT id, title, description, completed FROM tasks WHERE id > ? ORDER BY id LIMIT ?"
+)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    initialize_database()
+    pruner = asyncio.create_task(change_feed.maintain())
+    yield
+    pruner.cancel()
+    with suppress(asyncio.CancelledError):
+        await pruner
+    close_async_db()
 
-from .database import get_db
 
 app = FastAPI(
     title="To-Do List API",
     description="A simple and efficient API for managing your to-do lists.",
     version="1.0.0",
+    lifespan=lifespan,
 )
+app.add_middleware(MetricsMiddleware, metrics=metrics)
+change_feed = ChangeFeed(lambda: get_async_db())
 
 class Task(BaseModel):
     id: int | None = None
@@ -18,54 +68,363 @@ class Task(BaseModel):
     description: str | None = None
     completed: bool = False
 
+TaskList = TypeAdapter(List[Task])
+
+def dump_task_rows(rows) -> bytes:
+    """
+    Serializes (id, title, description, completed) rows as a JSON list of tasks.
+
+    With fast serialization enabled, rows that already match the Task schema are
+    encoded directly; anything else goes through full pydantic validation.
+    """
+    if serialization.FAST_JSON:
+        body = encode_task_rows(rows)
+        if body is not None:
+            return body
+    tasks = TaskList.validate_python([dict(zip(TASK_FIELDS, row)) for row in rows])
+    return TaskList.dump_json(tasks)
+
+class BulkDelete(BaseModel):
+    ids: List[int]
+
+class BulkResult(BaseModel):
+    id: int
+    status: str
+
+def data_changed():
+    """Wakes the change feed after a write; the write itself bumped the response cache."""
+    change_feed.notify()
+
 @app.post("/tasks/", response_model=Task, status_code=201)
 async def create_task(task: Task):
     """Creates a new task in the database."""
-    query = "INSERT INTO tasks (title, description, completed) VALUES (?, ?, ?)"
-    with get_db() as db:
-        cursor = db.execute_query(query, (task.title, task.description, task.completed))
-        task.id = cursor.lastrowid
+    result = await get_async_db().execute_query(
+        INSERT_TASK, (task.title, task.description, task.completed)
+    )
+    task.id = result.lastrowid
+    data_changed()
     return task
 
+def check_bulk_size(items: list):
+    """Rejects batches larger than MAX_BULK_SIZE before any work is done."""
+    if len(items) > MAX_BULK_SIZE:
+        raise HTTPException(
+            status_code=413, detail=f"At most {MAX_BULK_SIZE} items per request"
+        )
+
+def bulk_create(db, tasks: List[Task]) -> List[int]:
+    """Inserts tasks in one transaction and returns their new IDs in order."""
+    with db.transaction():
+        return [
+            db.execute_query(INSERT_TASK, (t.title, t.description, t.completed)).lastrowid
+            for t in tasks
+        ]
+
+def bulk_update(db, tasks: List[Task]) -> List[BulkResult]:
+    """Updates tasks in one transaction and reports which IDs existed."""
+    results = []
+    with db.transaction():
+        for task in tasks:
+            params = (task.title, task.description, task.completed, task.id)
+            found = db.execute_query(UPDATE_TASK, params).rowcount
+            results.append(BulkResult(id=task.id, status="updated" if found else "not_found"))
+    return results
+
+def bulk_delete(db, ids: List[int]) -> List[BulkResult]:
+    """Deletes tasks in one transaction and reports which IDs existed."""
+    results = []
+    with db.transaction():
+        for task_id in ids:
+            found = db.execute_query(DELETE_TASK, (task_id,)).rowcount
+            results.append(BulkResult(id=task_id, status="deleted" if found else "not_found"))
+    return results
+
+@app.post("/tasks/bulk", response_model=List[Task], status_code=201)
+async def create_tasks(tasks: List[Task]):
+    """Creates many tasks in a single transaction and returns them with their IDs."""
+    check_bulk_size(tasks)
+    ids = await get_async_db().run(bulk_create, tasks)
+    data_changed()
+    for task, task_id in zip(tasks, ids):
+        task.id = task_id
+    return tasks
+
+@app.put("/tasks/bulk", response_model=List[BulkResult])
+async def update_tasks(tasks: List[Task]):
+    """Updates many tasks in a single transaction, reporting each one's outcome."""
+    check_bulk_size(tasks)
+    missing = [index for index, task in enumerate(tasks) if task.id is None]
+    if missing:
+        raise HTTPException(
+            status_code=422, detail=f"Tasks at positions {missing} have no id"
+        )
+    results = await get_async_db().run(bulk_update, tasks)
+    data_changed()
+    return results
+
+@app.post("/tasks/bulk/delete", response_model=List[BulkResult])
+async def delete_tasks(payload: BulkDelete):
+    """Deletes many tasks by ID in a single transaction, reporting each one's outcome."""
+    check_bulk_size(payload.ids)
+    results = await get_async_db().run(bulk_delete, payload.ids)
+    data_changed()
+    return results
+
+async def cached_get(request: Request, render) -> Response:
+    """
+    Serves a GET from the response cache, honouring If-None-Match.
+
+    On a miss, render() is awaited for the JSON body and extra headers, which
+    are cached under the data version current when rendering started.
+    """
+    key = f"{request.url.path}?{urlencode(sorted(request.query_params.multi_items()))}"
+    if_none_match = request.headers.get("if-none-match")
+    etag = response_cache.etag(key)
+    if etag_matches(if_none_match, etag, wildcard=False):
+        return Response(status_code=304, headers={"ETag": etag})
+    entry = response_cache.get(key)
+    if entry is None:
+        version = response_cache.version
+        body, headers = await render()
+        entry = response_cache.put(key, version, body, headers)
+    # Only now is a current representation known to exist for "*" to match.
+    if etag_matches(if_none_match, entry.etag):
+        return Response(status_code=304, headers={"ETag": entry.etag})
+    headers = {**entry.headers, "ETag": entry.etag}
+    return Response(entry.body, media_type="application/json", headers=headers)
+
+def escape_like(value: str) -> str:
+    """Escapes LIKE wildcards so value is matched literally."""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
 @app.get("/tasks/", response_model=List[Task])
-async def read_tasks():
-    """Retrieves all tasks from the database."""
-    query = "SELECT * FROM tasks"
-    with get_db() as db:
-        tasks = db.fetchall(query)
-    return [dict(row) for row in tasks]
+async def read_tasks(
+    request: Request,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    after: int | None = Query(None, ge=0, description="Only return tasks with a larger id."),
+    completed: bool | None = None,
+    title_prefix: str | None = Query(
+        None, min_length=1, description="Case-insensitive title prefix."
+    ),
+):
+    """
+    Retrieves a page of tasks ordered by id.
+
+    When more tasks remain, the id to pass as `after` for the next page is sent
+    in the X-Next-Cursor header, along with a Link header pointing at that page.
+    Responses carry an ETag and are served from the response cache until the
+    next write.
+    """
+    conditions, params = [], []
+    if after is not None:
+        conditions.append("id > ?")
+        params.append(after)
+    if completed is not None:
+        conditions.append("completed = ?")
+        params.append(completed)
+    if title_prefix:
+        conditions.append("title LIKE ? ESCAPE '\\'")
+        params.append(escape_like(title_prefix) + "%")
+    where = f" WHERE {' AND '.join(conditions)}" if conditions else ""
+    query = (
+        f"SELECT id, title, description, completed FROM tasks{where} ORDER BY id LIMIT ?"
+    )
+    params.append(limit + 1)
+
+    async def render():
+        rows = await get_async_db().fetchall(query, tuple(params))
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = rows[-1]["id"]
+            next_url = request.url.include_query_params(after=next_cursor)
+            headers["X-Next-Cursor"] = str(next_cursor)
+            headers["Link"] = f'<{next_url}>; rel="next"'
+        return dump_task_rows(rows), headers
+
+    return await cached_get(request, render)
+
+def to_match_query(text: str, prefix: bool = False) -> str | None:
+    """
+    Turns free text into an FTS5 query that ANDs every word, optionally treating
+    the last word as a prefix. Words are quoted so FTS5 syntax in the input is inert.
+    """
+    words = re.findall(r"\w+", text)
+    if not words:
+        return None
+    return " ".join(f'"{word}"' for word in words) + ("*" if prefix else "")
+
+@app.get("/tasks/search", response_model=List[Task])
+async def search_tasks(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Words to find in titles and descriptions."),
+    limit: int = Query(20, ge=1, le=MAX_SEARCH_PAGE_SIZE),
+    offset: int = Query(0, ge=0),
+    prefix: bool = Query(False, description="Match the last word as a prefix."),
+):
+    """
+    Searches task titles and descriptions, best matches first.
+
+    Title matches rank above description matches. When more results remain, the
+    offset of the next page is sent in the X-Next-Offset header. Prefix matching
+    has to rank every word sharing the prefix, so short prefixes on a large
+    table cost far more than whole-word searches.
+    """
+    match = to_match_query(q, prefix)
+    if match is None:
+        raise HTTPException(status_code=422, detail="Search query has no words")
+
+    async def render():
+        rows = await get_async_db().fetchall(SEARCH_TASKS, (match, limit + 1, offset))
+        headers = {}
+        if len(rows) > limit:
+            rows = rows[:limit]
+            headers["X-Next-Offset"] = str(offset + limit)
+        return dump_task_rows(rows), headers
+
+    return await cached_get(request, render)
+
+def fetch_export_chunk(db, after: int, chunk_size: int) -> list:
+    """Reads the next chunk of task tuples after the given id."""
+    return list(db.iter_rows(EXPORT_CHUNK, (after, chunk_size), row_type="tuple"))
+
+async def export_chunks(chunk_size: int):
+    """Yields every task as tuples, one keyset-paginated chunk at a time."""
+    db = get_async_db()
+    after = 0
+    while True:
+        rows = await db.run(fetch_export_chunk, after, chunk_size)
+        if not rows:
+            return
+        yield rows
+        after = rows[-1][0]
+
+async def ndjson_lines(chunk_size: int):
+    """Encodes exported tasks as newline-delimited JSON, one chunk per yield."""
+    async for rows in export_chunks(chunk_size):
+        lines = []
+        for row in rows:
+            task = dict(zip(EXPORT_FIELDS, row))
+            task["completed"] = bool(task["completed"])
+            lines.append(json.dumps(task))
+        yield "\n".join(lines) + "\n"
+
+async def csv_lines(chunk_size: int):
+    """Encodes exported tasks as CSV with a header row, one chunk per yield."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(EXPORT_FIELDS)
+    async for rows in export_chunks(chunk_size):
+        writer.writerows((*row[:3], bool(row[3])) for row in rows)
+        yield buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+    if buffer.tell():
+        yield buffer.getvalue()
+
+@app.get("/tasks/export")
+async def export_tasks(
+    format: Literal["ndjson", "csv"] = "ndjson",
+    chunk_size: int = Query(EXPORT_CHUNK_SIZE, ge=1, le=50000),
+):
+    """
+    Streams every task as NDJSON or CSV.
+
+    Rows are read from SQLite in keyset-paginated chunks and sent as soon as each
+    chunk is encoded, so memory use does not grow with the table. Each chunk is
+    its own read, so the export is not a single point-in-time snapshot.
+    """
+    lines = ndjson_lines(chunk_size) if format == "ndjson" else csv_lines(chunk_size)
+    return StreamingResponse(
+        lines,
+        media_type=EXPORT_MEDIA_TYPES[format],
+        headers={"Content-Disposition": f'attachment; filename="tasks.{format}"'},
+    )
+
+def format_change(change) -> str:
+    """Encodes a change-log entry (or a reset/heartbeat) as a server-sent event."""
+    if change is None:
+        return ": keepalive\n\n"
+    if change[0] == "reset":
+        return f"id: {change[1]}\nevent: reset\ndata: {{}}\n\n"
+    seq, op, task_id, title, description, completed = change
+    if op == "delete":
+        data = {"id": task_id}
+    else:
+        data = {
+            "id": task_id,
+            "title": title,
+            "description": description,
+            "completed": bool(completed),
+        }
+    return f"id: {seq}\nevent: {op}\ndata: {json.dumps(data)}\n\n"
+
+async def change_events(since: int | None):
+    """Yields the change feed as server-sent events."""
+    yield f"retry: {SSE_RETRY_MS}\n\n"
+    async for change in change_feed.subscribe(since):
+        yield format_change(change)
+
+@app.get("/tasks/changes")
+async def stream_changes(
+    since: int | None = Query(None, ge=0, description="Resume after this event id."),
+    last_event_id: int | None = Header(None, ge=0),
+):
+    """
+    Streams task creates, updates and deletes as server-sent events.
+
+    Each event's id is its change-log sequence number. Reconnecting clients send
+    it back as Last-Event-ID (or `since`) and first receive every change they
+    missed. Without either, only new changes are sent. A `reset` event means the
+    missed changes are no longer in the log: reload the tasks, then carry on.
+    """
+    if last_event_id is not None:
+        since = last_event_id
+    return StreamingResponse(
+        change_events(since),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
 
 @app.get("/tasks/{task_id}", response_model=Task)
-async def read_task(task_id: int):
-    """Retrieves a single task by its ID."""
+async def read_task(task_id: int, request: Request):
+    """Retrieves a single task by its ID, with an ETag for conditional requests."""
     query = "SELECT * FROM tasks WHERE id = ?"
-    with get_db() as db:
-        task = db.fetchone(query, (task_id,))
-    if task is None:
-        raise HTTPException(status_code=404, detail="Task not found")
-    return dict(task)
+
+    async def render():
+        task = await get_async_db().fetchone(query, (task_id,))
+        if task is None:
+            raise HTTPException(status_code=404, detail="Task not found")
+        return Task.model_validate(dict(task)).model_dump_json().encode(), {}
+
+    return await cached_get(request, render)
 
 @app.put("/tasks/{task_id}", response_model=Task)
 async def update_task(task_id: int, task: Task):
     """Updates an existing task."""
-    query = "UPDATE tasks SET title = ?, description = ?, completed = ? WHERE id = ?"
-    with get_db() as db:
-        cursor = db.execute_query(query, (task.title, task.description, task.completed, task_id))
-    if cursor.rowcount == 0:
+    result = await get_async_db().execute_query(
+        UPDATE_TASK, (task.title, task.description, task.completed, task_id)
+    )
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Task not found")
+    data_changed()
     task.id = task_id
     return task
 
 @app.delete("/tasks/{task_id}", response_model=Dict[str, str])
 async def delete_task(task_id: int):
     """Deletes a task from the database."""
-    query = "DELETE FROM tasks WHERE id = ?"
-    with get_db() as db:
-        cursor = db.execute_query(query, (task_id,))
-    if cursor.rowcount == 0:
+    result = await get_async_db().execute_query(DELETE_TASK, (task_id,))
+    if result.rowcount == 0:
         raise HTTPException(status_code=404, detail="Task not found")
+    data_changed()
     return {"message": "Task deleted successfully"}
 
+@app.get("/metrics", response_class=PlainTextResponse, include_in_schema=False)
+async def read_metrics():
+    """Exposes request and database timings in the Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type=METRICS_CONTENT_TYPE)
+
 if __name__ == "__main__":
     import uvicorn
     from .database import initialize_database
@@ -0,0 +1,146 @@
+# apps/todo_api/src/todo_api/metrics.py
+
+from bisect import bisect_left
+from contextvars import ContextVar
+from time import perf_counter
+
+LATENCY_BUCKETS = (
+    0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0
+)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+_request_db_time: ContextVar[list | None] = ContextVar("request_db_time", default=None)
+
+
+class Histogram:
+    """A fixed-bucket histogram in the Prometheus style."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def render(self, name: str, labels: str) -> list[str]:
+        lines = []
+        cumulative = 0
+        for bound, count in zip(LATENCY_BUCKETS + (float("inf"),), self.counts):
+            cumulative += count
+            le = "+Inf" if bound == float("inf") else repr(bound)
+            lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+        lines.append(f"{name}_sum{{{labels}}} {self.sum}")
+        lines.append(f"{name}_count{{{labels}}} {self.count}")
+        return lines
+
+
+class Metrics:
+    """
+    Request and database timings for the API, rendered as Prometheus text.
+
+    Every update happens on the event loop thread (the middleware runs there and
+    the async database reports back there), so no locks are taken.
+    """
+
+    def __init__(self):
+        self.in_progress = 0
+        self.requests = {}
+        self.db_time = {}
+        self.db_calls = {}
+
+    def observe_request(self, method, route, status, elapsed, db_time, db_calls):
+        key = (method, route, str(status))
+        histogram = self.requests.get(key)
+        if histogram is None:
+            histogram = self.requests[key] = Histogram()
+        histogram.observe(elapsed)
+        if db_calls:
+            route_key = (method, route)
+            histogram = self.db_time.get(route_key)
+            if histogram is None:
+                histogram = self.db_time[route_key] = Histogram()
+            histogram.observe(db_time)
+            self.db_calls[route_key] = self.db_calls.get(route_key, 0) + db_calls
+
+    def render(self) -> str:
+        lines = [
+            "# HELP todo_api_requests_in_progress Requests currently being served.",
+            "# TYPE todo_api_requests_in_progress gauge",
+            f"todo_api_requests_in_progress {self.in_progress}",
+            "# HELP todo_api_request_duration_seconds Request latency by route and status.",
+            "# TYPE todo_api_request_duration_seconds histogram",
+        ]
+        for (method, route, status), histogram in sorted(self.requests.items()):
+            labels = f'method="{method}",route="{route}",status="{status}"'
+            lines.extend(histogram.render("todo_api_request_duration_seconds", labels))
+        lines += [
+            "# HELP todo_api_db_duration_seconds Time spent in database calls per request.",
+            "# TYPE todo_api_db_duration_seconds histogram",
+        ]
+        for (method, route), histogram in sorted(self.db_time.items()):
+            labels = f'method="{method}",route="{route}"'
+            lines.extend(histogram.render("todo_api_db_duration_seconds", labels))
+        lines += [
+            "# HELP todo_api_db_calls_total Database calls made while serving requests.",
+            "# TYPE todo_api_db_calls_total counter",
+        ]
+        for (method, route), count in sorted(self.db_calls.items()):
+            lines.append(f'todo_api_db_calls_total{{method="{method}",route="{route}"}} {count}')
+        return "\n".join(lines) + "\n"
+
+
+def record_db_time(elapsed: float):
+    """AsyncDatabase observer that charges a call's time to the current request."""
+    totals = _request_db_time.get()
+    if totals is not None:
+        totals[0] += elapsed
+        totals[1] += 1
+
+
+class MetricsMiddleware:
+    """Pure ASGI middleware that times every HTTP request into a Metrics instance."""
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status = 500
+        totals = [0.0, 0]
+        token = _request_db_time.set(totals)
+
+        async def send_wrapper(message):
+            nonlocal status
+            if message["type"] == "http.response.start":
+                status = message["status"]
+            await send(message)
+
+        self.metrics.in_progress += 1
+        started = perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            elapsed = perf_counter() - started
+            self.metrics.in_progress -= 1
+            _request_db_time.reset(token)
+            route = scope.get("route")
+            self.metrics.observe_request(
+                scope["method"],
+                route.path if route is not None else "unmatched",
+                status,
+                elapsed,
+                totals[0],
+                totals[1],
+            )
+
+
+metrics = Metrics()
@@ -0,0 +1,113 @@
+# apps/todo_api/src/todo_api/response_cache.py
+
+import hashlib
+import threading
+import time
+import uuid
+from collections import OrderedDict, namedtuple
+
+DEFAULT_MAX_ENTRIES = 512
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+# Matches the result cache's TTL, which already bounds how stale reads can be.
+DEFAULT_MAX_AGE = 60.0
+
+CachedResponse = namedtuple("CachedResponse", ["etag", "body", "headers"])
+
+
+def etag_matches(if_none_match: str | None, etag: str, wildcard: bool = True) -> bool:
+    """
+    Checks an If-None-Match header value against a strong ETag.
+
+    "*" matches any current representation, so pass wildcard=False until the
+    resource is known to exist.
+    """
+    if not if_none_match:
+        return False
+    candidates = [value.strip() for value in if_none_match.split(",")]
+    return (wildcard and "*" in candidates) or etag in candidates
+
+
+class ResponseCache:
+    """
+    Caches serialized GET response bodies under a data version with strong ETags.
+
+    Every committed write calls bump() (the database layer does this through
+    the result cache, on whatever thread wrote), which changes every ETag and
+    drops every cached body, so a matching If-None-Match can be answered with 304 without
+    querying SQLite. The version lives in this process only, so writes made by
+    other processes (another uvicorn worker, say) are not seen; to bound that,
+    the version also advances on its own once it is max_age seconds old, which
+    expires every body and ETag. max_age=None disables that.
+    """
+
+    def __init__(
+        self,
+        max_entries=DEFAULT_MAX_ENTRIES,
+        max_bytes=DEFAULT_MAX_BYTES,
+        max_age=DEFAULT_MAX_AGE,
+    ):
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.max_age = max_age
+        self._version = 0
+        self._bumped_at = time.monotonic()
+        # Distinguishes ETags issued before and after a restart resets version.
+        self._instance = uuid.uuid4().hex[:8]
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.RLock()
+
+    @property
+    def version(self) -> int:
+        """The current data version; it advances on its own after max_age seconds."""
+        with self._lock:
+            self._expire()
+            return self._version
+
+    def _expire(self):
+        if self.max_age is not None and time.monotonic() - self._bumped_at >= self.max_age:
+            self.bump()
+
+    def etag(self, key: str, version: int | None = None) -> str:
+        """Returns the strong ETag for key at version (the current one by default)."""
+        version = self.version if version is None else version
+        digest = hashlib.blake2b(key.encode(), digest_size=8).hexdigest()
+        return f'"{self._instance}-{version}-{digest}"'
+
+    def get(self, key: str) -> CachedResponse | None:
+        """Returns the cached response for key, if any."""
+        with self._lock:
+            self._expire()
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def put(self, key: str, version: int, body: bytes, headers: dict) -> CachedResponse:
+        """
+        Caches a body rendered from data read at version and returns it with
+        its ETag. Bodies read before the latest bump() are returned uncached.
+        """
+        entry = CachedResponse(self.etag(key, version), body, headers)
+        with self._lock:
+            if version != self.version or len(body) > self.max_bytes:
+                return entry
+            if key in self._entries:
+                self._bytes -= len(self._entries.pop(key).body)
+            self._entries[key] = entry
+            self._bytes += len(body)
+            while len(self._entries) > self.max_entries or self._bytes > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._bytes -= len(evicted.body)
+        return entry
+
+    def bump(self):
+        """Records that the data changed, invalidating every ETag and body."""
+        with self._lock:
+            self._version += 1
+            self._bumped_at = time.monotonic()
+            self._entries.clear()
+            self._bytes = 0
+
+
+response_cache = ResponseCache()
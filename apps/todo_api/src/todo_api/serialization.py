@@ -0,0 +1,45 @@
+# apps/todo_api/src/todo_api/serialization.py
+
+import os
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+# Opt in with TODO_API_FAST_JSON=1; list responses are byte-identical either way.
+FAST_JSON = os.getenv("TODO_API_FAST_JSON") == "1"
+TASK_FIELDS = ("id", "title", "description", "completed")
+
+
+def encode_task_rows(rows) -> bytes | None:
+    """
+    Encodes (id, title, description, completed) rows as a JSON list of tasks
+    without building Task models.
+
+    Every row is type-checked against the Task schema first. Returns None when
+    a row would need pydantic's coercion or orjson is missing, so the caller can
+    fall back to full validation.
+    """
+    if orjson is None:
+        return None
+    tasks = []
+    append = tasks.append
+    for task_id, title, description, completed in rows:
+        if (
+            type(task_id) is not int
+            or type(title) is not str
+            or (description is not None and type(description) is not str)
+            or type(completed) is not int
+            or (completed != 0 and completed != 1)
+        ):
+            return None
+        append(
+            {
+                "id": task_id,
+                "title": title,
+                "description": description,
+                "completed": completed == 1,
+            }
+        )
+    return orjson.dumps(tasks)
@@ -3,27 +3,38 @@
 import pytest
 from fastapi.testclient import TestClient
 from todo_api.main import app
-from todo_api.database import get_db, TABLE_NAME, TABLE_SCHEMA
+from todo_api.database import initialize_database
+import csv
+import io
+import json
 import sqlite3
 import os
 
 @pytest.fixture(scope="function")
 def client(tmp_path_factory, monkeypatch):
     db_path = tmp_path_factory.mktemp("data") / "test_todo.db"
-    
-    def override_get_db():
-        from database_utils.db_connector import DatabaseManager
-        return DatabaseManager(db_path)
+    from database_utils.async_db import AsyncDatabase
+    from database_utils.result_cache import ResultCache
+    from todo_api.database import bump_responses
+    from todo_api.metrics import record_db_time
+    from todo_api.response_cache import ResponseCache
+    responses = ResponseCache()
+    monkeypatch.setattr("todo_api.main.response_cache", responses)
+    monkeypatch.setattr("todo_api.database.response_cache", responses)
 
-    monkeypatch.setattr("todo_api.main.get_db", override_get_db)
+    cache = ResultCache(on_invalidate=bump_responses)
+    db = AsyncDatabase(db_path, cache=cache, observer=record_db_time)
+    monkeypatch.setattr("todo_api.main.get_async_db", lambda: db)
+    monkeypatch.setattr("todo_api.database.result_cache", cache)
     
-    with sqlite3.connect(db_path) as conn:
-        conn.execute(f"DROP TABLE IF EXISTS {TABLE_NAME}")
-        conn.execute(f"CREATE TABLE IF NOT EXISTS {TABLE_NAME} ({TABLE_SCHEMA})")
-        conn.commit()
-        
+    initialize_database(db_path)
+
     yield TestClient(app)
 
+    db.close()
+    from database_utils.pool import close_all_pools
+    close_all_pools()
+
 
 def test_create_task(client):
     response = client.post("/tasks/", json={"title": "Test Task", "description": "Test Description"})
@@ -68,4 +79,377 @@ def test_delete_task(client):
     assert response.status_code == 200
     
     response = client.get(f"/tasks/{task_id}")
-    assert response.status_code == 404
\ No newline at end of file
+    assert response.status_code == 404
+
+def test_initialize_database_indexes_completed(tmp_path):
+    db_path = tmp_path / "migrated.db"
+    initialize_database(db_path)
+    initialize_database(db_path)
+
+    with sqlite3.connect(db_path) as conn:
+        versions = [row[0] for row in conn.execute("SELECT version FROM schema_migrations")]
+        plan = conn.execute("EXPLAIN QUERY PLAN SELECT * FROM tasks WHERE completed = 1").fetchall()
+    assert versions == [1, 2, 3, 4]
+    assert "idx_tasks_completed" in plan[0][-1]
+
+
+def test_concurrent_requests(client):
+    from concurrent.futures import ThreadPoolExecutor
+
+    def create(i):
+        return client.post("/tasks/", json={"title": f"Task {i}"}).json()["id"]
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        ids = list(executor.map(create, range(40)))
+    assert len(set(ids)) == 40
+    assert len(client.get("/tasks/").json()) == 40
+
+
+def test_read_tasks_paginates_with_cursor(client):
+    for i in range(5):
+        client.post("/tasks/", json={"title": f"Task {i}"})
+
+    response = client.get("/tasks/", params={"limit": 2})
+    assert [task["title"] for task in response.json()] == ["Task 0", "Task 1"]
+    cursor = response.headers["X-Next-Cursor"]
+    assert 'rel="next"' in response.headers["Link"]
+
+    seen = len(response.json())
+    while cursor:
+        response = client.get("/tasks/", params={"limit": 2, "after": cursor})
+        seen += len(response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+    assert seen == 5
+    assert client.get("/tasks/", params={"limit": 0}).status_code == 422
+
+def test_read_tasks_filters(client):
+    client.post("/tasks/", json={"title": "Buy milk", "completed": True})
+    client.post("/tasks/", json={"title": "buy bread"})
+    client.post("/tasks/", json={"title": "Call 100%_done"})
+
+    done = client.get("/tasks/", params={"completed": True}).json()
+    assert [task["title"] for task in done] == ["Buy milk"]
+    bought = client.get("/tasks/", params={"title_prefix": "buy", "completed": False}).json()
+    assert [task["title"] for task in bought] == ["buy bread"]
+    assert len(client.get("/tasks/", params={"title_prefix": "Call 100%_"}).json()) == 1
+    assert client.get("/tasks/", params={"title_prefix": "Call 1000"}).json() == []
+
+
+def test_bulk_create_update_delete(client):
+    response = client.post("/tasks/bulk", json=[{"title": f"Task {i}"} for i in range(3)])
+    assert response.status_code == 201
+    created = response.json()
+    ids = [task["id"] for task in created]
+    assert len(set(ids)) == 3
+
+    updates = [{"id": ids[0], "title": "Renamed", "completed": True}, {"id": 9999, "title": "Ghost"}]
+    response = client.put("/tasks/bulk", json=updates)
+    assert response.status_code == 200
+    assert response.json() == [{"id": ids[0], "status": "updated"}, {"id": 9999, "status": "not_found"}]
+    assert client.get(f"/tasks/{ids[0]}").json()["title"] == "Renamed"
+
+    response = client.post("/tasks/bulk/delete", json={"ids": [ids[1], 9999]})
+    assert [item["status"] for item in response.json()] == ["deleted", "not_found"]
+    assert len(client.get("/tasks/").json()) == 2
+
+def test_bulk_payload_is_validated_as_a_whole(client):
+    response = client.post("/tasks/bulk", json=[{"title": "Fine"}, {"description": "No title"}])
+    assert response.status_code == 422
+    assert client.get("/tasks/").json() == []
+
+    response = client.put("/tasks/bulk", json=[{"title": "No id"}])
+    assert response.status_code == 422
+
+
+def test_conditional_get_returns_304_until_a_write(client):
+    task_id = client.post("/tasks/", json={"title": "Cached"}).json()["id"]
+
+    for path in ("/tasks/", f"/tasks/{task_id}"):
+        first = client.get(path)
+        etag = first.headers["ETag"]
+        assert client.get(path).content == first.content
+        not_modified = client.get(path, headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304
+        assert not_modified.headers["ETag"] == etag
+
+    client.put(f"/tasks/{task_id}", json={"title": "Changed"})
+    response = client.get(f"/tasks/{task_id}", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.json()["title"] == "Changed"
+    assert response.headers["ETag"] != etag
+
+def test_writes_outside_the_handlers_change_etags(client, monkeypatch):
+    from todo_api import main
+    from todo_api.database import bulk_insert_tasks
+
+    first = client.get("/tasks/")
+    etag = first.headers["ETag"]
+    monkeypatch.setattr("todo_api.database.DATABASE_FILE", main.get_async_db().db_path)
+    bulk_insert_tasks([("Imported", None, False)])
+
+    response = client.get("/tasks/", headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert [task["title"] for task in response.json()] == ["Imported"]
+
+def test_wildcard_if_none_match_needs_an_existing_task(client):
+    task_id = client.post("/tasks/", json={"title": "Exists"}).json()["id"]
+    assert client.get("/tasks/99999", headers={"If-None-Match": "*"}).status_code == 404
+    assert client.get(f"/tasks/{task_id}", headers={"If-None-Match": "*"}).status_code == 304
+
+def test_response_cache_expires_after_max_age():
+    import time
+    from todo_api.response_cache import ResponseCache
+
+    cache = ResponseCache(max_age=0.05)
+    entry = cache.put("/tasks/", cache.version, b"[]", {})
+    assert cache.get("/tasks/") == entry
+    assert cache.etag("/tasks/") == entry.etag
+    time.sleep(0.06)
+    assert cache.get("/tasks/") is None
+    assert cache.etag("/tasks/") != entry.etag
+
+def test_pagination_headers_are_cached(client):
+    client.post("/tasks/bulk", json=[{"title": f"Task {i}"} for i in range(3)])
+    first = client.get("/tasks/", params={"limit": 2})
+    second = client.get("/tasks/", params={"limit": 2})
+    assert first.headers["X-Next-Cursor"] == second.headers["X-Next-Cursor"]
+
+
+def test_export_streams_ndjson_and_csv(client):
+    client.post("/tasks/bulk", json=[{"title": f"Task {i}", "completed": i % 2 == 0} for i in range(5)])
+    client.post("/tasks/", json={"title": "Quote, \"comma\"", "description": "multi\nline"})
+
+    response = client.get("/tasks/export", params={"chunk_size": 2})
+    assert response.headers["content-type"].startswith("application/x-ndjson")
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 6
+    assert lines[0] == {"id": lines[0]["id"], "title": "Task 0", "description": None, "completed": True}
+
+    response = client.get("/tasks/export", params={"format": "csv", "chunk_size": 4})
+    rows = list(csv.reader(io.StringIO(response.text)))
+    assert rows[0] == ["id", "title", "description", "completed"]
+    assert len(rows) == 7
+    assert rows[-1][1:] == ['Quote, "comma"', "multi\nline", "False"]
+
+
+def test_search_ranks_and_stays_in_sync(client):
+    client.post("/tasks/bulk", json=[
+        {"title": "Water the plants", "description": "Garden"},
+        {"title": "Buy groceries", "description": "Milk and water"},
+        {"title": "Call mom"},
+    ])
+
+    titles = [task["title"] for task in client.get("/tasks/search", params={"q": "water"}).json()]
+    assert titles == ["Water the plants", "Buy groceries"]
+    assert client.get("/tasks/search", params={"q": "groc"}).json() == []
+    prefixed = client.get("/tasks/search", params={"q": "groc", "prefix": True}).json()
+    assert [task["title"] for task in prefixed] == ["Buy groceries"]
+
+    page = client.get("/tasks/search", params={"q": "water", "limit": 1})
+    assert page.headers["X-Next-Offset"] == "1"
+
+    task_id = client.get("/tasks/search", params={"q": "mom"}).json()[0]["id"]
+    client.put(f"/tasks/{task_id}", json={"title": "Call dad"})
+    assert client.get("/tasks/search", params={"q": "mom"}).json() == []
+    assert len(client.get("/tasks/search", params={"q": "dad"}).json()) == 1
+    client.delete(f"/tasks/{task_id}")
+    assert client.get("/tasks/search", params={"q": "dad"}).json() == []
+
+    assert client.get("/tasks/search", params={"q": 'plants" OR NEAR(*'}).status_code == 200
+    assert client.get("/tasks/search", params={"q": '" * ^'}).status_code == 422
+
+
+def test_metrics_endpoint(client):
+    task_id = client.post("/tasks/", json={"title": "Measured"}).json()["id"]
+    client.get(f"/tasks/{task_id}")
+    client.get("/no/such/route")
+
+    response = client.get("/metrics")
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain")
+    body = response.text
+    assert 'todo_api_request_duration_seconds_count{method="GET",route="/tasks/{task_id}",status="200"}' in body
+    assert 'route="unmatched",status="404"' in body
+    assert 'todo_api_db_calls_total{method="POST",route="/tasks/"}' in body
+    assert 'todo_api_db_duration_seconds_bucket{method="GET",route="/tasks/{task_id}",le="+Inf"}' in body
+
+
+def test_fast_serialization_matches_pydantic(client, monkeypatch):
+    client.post("/tasks/bulk", json=[
+        {"title": "Plain", "completed": True},
+        {"title": "Ünïcode \"quoted\"", "description": "line\nbreak"},
+    ])
+    slow = client.get("/tasks/", params={"limit": 1}).content
+    monkeypatch.setattr("todo_api.serialization.FAST_JSON", True)
+    client.post("/tasks/bulk/delete", json={"ids": []})  # invalidates cached bodies
+    assert client.get("/tasks/", params={"limit": 1}).content == slow
+
+    from todo_api.main import dump_task_rows
+    from todo_api.serialization import encode_task_rows
+    rows = [(1, "Plain", None, 1), (2, "Ünïcode", "x", 0)]
+    monkeypatch.setattr("todo_api.serialization.FAST_JSON", False)
+    assert encode_task_rows(rows) == dump_task_rows(rows)
+    odd = [(1, "Plain", None, "1")]
+    assert encode_task_rows(odd) is None
+    monkeypatch.setattr("todo_api.serialization.FAST_JSON", True)
+    assert json.loads(dump_task_rows(odd))[0]["completed"] is True
+
+
+def test_change_feed_replays_then_streams_live(client):
+    import asyncio
+    from todo_api import main
+
+    task_id = client.post("/tasks/", json={"title": "Watched"}).json()["id"]
+    client.put(f"/tasks/{task_id}", json={"title": "Renamed", "completed": True})
+
+    async def collect():
+        events = main.change_events(0)
+        replayed = [await anext(events) for _ in range(3)]
+        await asyncio.to_thread(client.delete, f"/tasks/{task_id}")
+        live = await asyncio.wait_for(anext(events), 5)
+        await events.aclose()
+
+        await main.get_async_db().execute_query("DELETE FROM task_changes WHERE seq <= 1")
+        events = main.change_events(0)
+        await anext(events)
+        reset = await anext(events)
+        await events.aclose()
+        return replayed, live, reset
+
+    replayed, live, reset = asyncio.run(collect())
+    assert replayed[0] == "retry: 3000\n\n"
+    assert replayed[1].startswith("id: 1\nevent: create\n")
+    assert json.loads(replayed[2].splitlines()[2][len("data: "):]) == {
+        "id": task_id, "title": "Renamed", "description": None, "completed": True,
+    }
+    assert live == f'id: 3\nevent: delete\ndata: {{"id": {task_id}}}\n\n'
+    assert reset == "id: 1\nevent: reset\ndata: {}\n\n"
+    assert main.change_feed._pump is None
+
+
+def test_change_feed_keeps_pump_for_lagged_subscriber(client):
+    import asyncio
+    from todo_api import main
+    from todo_api.changes import ChangeFeed
+
+    async def collect():
+        feed = ChangeFeed(main.get_async_db, queue_size=2, heartbeat=0.2)
+        slow = feed.subscribe()
+        fast = feed.subscribe()
+        slow_first = asyncio.ensure_future(anext(slow))
+        fast_first = asyncio.ensure_future(anext(fast))
+        await asyncio.sleep(0.1)
+        for i in range(4):
+            await asyncio.to_thread(client.post, "/tasks/", json={"title": f"t{i}"})
+            feed.notify()
+        await asyncio.sleep(0.2)
+        await fast_first
+        await fast.aclose()  # Leaves while the slow subscriber is lagged.
+
+        seen = [(await slow_first)[0]]
+        while len(seen) < 4:
+            seen.append((await anext(slow))[0])
+        assert await anext(slow) is None  # Caught up and back on the live queue.
+        await asyncio.to_thread(client.post, "/tasks/", json={"title": "after"})
+        feed.notify()
+        live = None
+        for _ in range(10):
+            live = await anext(slow)
+            if live is not None:
+                break
+        await slow.aclose()
+        return seen, live, feed
+
+    seen, live, feed = asyncio.run(collect())
+    assert seen == [1, 2, 3, 4]
+    assert live is not None and live[:2] == (5, "create")
+    assert feed._pump is None
+
+
+def test_change_log_is_pruned_without_subscribers(client, monkeypatch):
+    import asyncio
+    from todo_api import main
+    from todo_api.changes import ChangeFeed
+
+    monkeypatch.setattr("todo_api.changes.PRUNE_INTERVAL", 2)
+    client.post("/tasks/bulk", json=[{"title": f"t{i}"} for i in range(10)])
+    feed = ChangeFeed(main.get_async_db, retention=3)
+
+    async def prune_once():
+        pruner = asyncio.create_task(feed.maintain(period=60))
+        await asyncio.sleep(0.2)
+        pruner.cancel()
+
+    asyncio.run(prune_once())
+    with sqlite3.connect(main.get_async_db().db_path) as conn:
+        seqs = [row[0] for row in conn.execute("SELECT seq FROM task_changes ORDER BY seq")]
+    assert seqs == [8, 9, 10]
+    assert feed._pump is None
+
+
+def test_lagged_subscriber_is_reset_across_a_prune(client, monkeypatch):
+    import asyncio
+    from todo_api import main
+    from todo_api.changes import ChangeFeed
+
+    monkeypatch.setattr("todo_api.changes.PRUNE_INTERVAL", 0)
+
+    async def collect():
+        feed = ChangeFeed(main.get_async_db, queue_size=2, heartbeat=0.2, retention=2)
+        events = feed.subscribe()
+        first = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0.1)
+        for i in range(5):
+            await asyncio.to_thread(client.post, "/tasks/", json={"title": f"t{i}"})
+            feed.notify()
+        await asyncio.sleep(0.2)
+        await feed.prune()  # Keeps only seqs 4 and 5; the subscriber has seen 1.
+
+        seen = [(await first)[0]]
+        while len(seen) < 4:
+            seen.append((await anext(events))[0])
+        await events.aclose()
+        return seen
+
+    assert asyncio.run(collect()) == [1, "reset", 4, 5]
+
+
+def test_racing_first_subscribers_keep_the_pump_cursor(client):
+    import asyncio
+    from todo_api import main
+    from todo_api.changes import ChangeFeed, latest_seq
+
+    class SlowSecondStart:
+        """Holds the second subscriber's latest_seq read until released."""
+
+        def __init__(self, db):
+            self.db = db
+            self.starts = 0
+            self.release = asyncio.Event()
+
+        async def run(self, fn, *args):
+            if fn is latest_seq:
+                self.starts += 1
+                if self.starts == 2:
+                    await self.release.wait()
+            return await self.db.run(fn, *args)
+
+    async def collect():
+        db = SlowSecondStart(main.get_async_db())
+        feed = ChangeFeed(lambda: db, poll_interval=30, heartbeat=0.5)
+        first, second = feed.subscribe(), feed.subscribe()
+        first_event = asyncio.ensure_future(anext(first))
+        second_event = asyncio.ensure_future(anext(second))
+        await asyncio.sleep(0.1)  # The first subscriber's pump is running.
+        await asyncio.to_thread(client.post, "/tasks/", json={"title": "Raced"})
+        db.release.set()
+        await asyncio.sleep(0.1)
+        feed.notify()
+        events = [await first_event, await second_event]
+        await first.aclose()
+        await second.aclose()
+        return events
+
+    first, second = asyncio.run(collect())
+    assert first is not None and first[:2] == (1, "create")
+    assert second is not None and second[:2] == (1, "create")
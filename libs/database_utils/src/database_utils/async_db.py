@@ -0,0 +1,118 @@
+# libs/database_utils/src/database_utils/async_db.py
+
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from time import perf_counter
+
+from rich.console import Console
+
+from .db_connector import DatabaseManager
+from .pool import ConnectionPool
+from .writer import WriteResult
+
+console = Console()
+
+DEFAULT_MAX_WORKERS = 4
+
+
+def _execute_query(db, query, params):
+    cursor = db.execute_query(query, params)
+    return WriteResult(cursor.lastrowid, cursor.rowcount)
+
+
+class AsyncDatabase:
+    """
+    Runs DatabaseManager calls on a small thread pool so they never block the
+    event loop.
+
+    Every worker thread enters its own DatabaseManager once and keeps it (and
+    its connection) for its whole life, so connections are never shared between
+    threads. Those connections come from a private pool with one slot per
+    worker, never from the shared pool that get_pool() hands out: workers pin
+    their connections, so sharing would starve (or be starved by) other
+    callers. Extra keyword arguments are passed to each manager.
+
+    If observer is given, it is called on the event loop thread with the seconds
+    each call spent executing on its worker (excluding time queued).
+    """
+
+    def __init__(
+        self, db_path, max_workers=DEFAULT_MAX_WORKERS, observer=None, **manager_kwargs
+    ):
+        self.db_path = db_path
+        self.max_workers = max_workers
+        self.observer = observer
+        self._manager_kwargs = manager_kwargs
+        self._local = threading.local()
+        self._managers = []
+        self._lock = threading.Lock()
+        self._pool = ConnectionPool(
+            db_path,
+            max_size=max_workers,
+            read_only=manager_kwargs.get("single_writer", False),
+        )
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix="sqlite-async",
+            initializer=self._open_worker,
+        )
+
+    def _open_worker(self):
+        db = DatabaseManager(self.db_path, pool=self._pool, **self._manager_kwargs).__enter__()
+        self._local.db = db
+        with self._lock:
+            self._managers.append(db)
+
+    def _call(self, fn, args):
+        return fn(self._local.db, *args)
+
+    def _timed_call(self, fn, args, timing):
+        started = perf_counter()
+        try:
+            return fn(self._local.db, *args)
+        finally:
+            timing[0] = perf_counter() - started
+
+    async def run(self, fn, *args):
+        """Awaits fn(db, *args) executed on a worker with that worker's manager."""
+        loop = asyncio.get_running_loop()
+        if self.observer is None:
+            return await loop.run_in_executor(self._executor, self._call, fn, args)
+        timing = [0.0]
+        try:
+            return await loop.run_in_executor(
+                self._executor, self._timed_call, fn, args, timing
+            )
+        finally:
+            self.observer(timing[0])
+
+    async def execute_query(self, query, params=()):
+        """Executes a write and returns a WriteResult with lastrowid and rowcount."""
+        return await self.run(_execute_query, query, params)
+
+    async def executemany(self, query, seq_of_params, **kwargs):
+        """Executes a query for every parameter set and returns the row count."""
+        return await self.run(
+            lambda db: db.executemany(query, seq_of_params, **kwargs)
+        )
+
+    async def fetchone(self, query, params=()):
+        """Executes a query and fetches one result."""
+        return await self.run(DatabaseManager.fetchone, query, params)
+
+    async def fetchall(self, query, params=()):
+        """Executes a query and fetches all results."""
+        return await self.run(DatabaseManager.fetchall, query, params)
+
+    def close(self):
+        """Waits for pending calls, then releases every worker's connection."""
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            managers, self._managers = self._managers, []
+        for db in managers:
+            db.__exit__(None, None, None)
+        self._pool.close()
+        console.log(
+            f"[bold green]Async database closed for:[/bold green] [cyan]{self.db_path}[/cyan]"
+        )
@@ -1,24 +1,85 @@
 # libs/database_utils/src/database_utils/db_connector.py
 
 import sqlite3
+from collections import namedtuple
 from contextlib import contextmanager
+from itertools import islice
+from time import perf_counter
 
 from rich.console import Console
 
+from .instrumentation import query_stats
+from .migrations import create_index_sql
+from .pool import DEFAULT_POOL_SIZE, connect_read_only, get_pool
+from .result_cache import MISS
+from .writer import get_writer
+
 console = Console()
 
+DEFAULT_CHUNK_SIZE = 10000
+DEFAULT_FETCH_SIZE = 1000
+ROW_TYPES = ("row", "tuple", "named")
+
 
 class DatabaseManager:
-    """A robust context manager for SQLite database connections."""
+    """
+    A robust context manager for SQLite database connections.
+
+    With pooled=True the connection is checked out of a shared, bounded pool of
+    warm connections for db_path instead of being opened and closed per context.
+    Passing a ConnectionPool as pool checks connections out of it instead.
+
+    With single_writer=True every write is handed to the shared SerializedWriter
+    for db_path, which group-commits writes from all threads on one connection,
+    while reads in this context use a read-only connection.
+
+    Every query is reported to stats (the shared query_stats by default), which
+    only does work while it is enabled.
 
-    def __init__(self, db_path):
+    An optional ResultCache makes fetchone() and fetchall() read-through; writes
+    made through execute_query() and executemany() invalidate the tables they
+    touch once they are committed.
+    """
+
+    def __init__(
+        self,
+        db_path,
+        pooled=False,
+        pool_size=DEFAULT_POOL_SIZE,
+        single_writer=False,
+        stats=None,
+        cache=None,
+        pool=None,
+    ):
         self.db_path = db_path
+        self.pooled = pooled or pool is not None
+        self.pool = pool
+        self.pool_size = pool_size
+        self.single_writer = single_writer
+        self.stats = query_stats if stats is None else stats
+        self.cache = cache
         self.conn = None
+        self._pool = None
+        self._writer = None
+        self._transaction_depth = 0
+        self._pending_invalidations = []
 
     def __enter__(self):
         """Opens the database connection."""
+        if self.single_writer:
+            # The writer opens (and if needed creates) the file before any reader.
+            self._writer = get_writer(self.db_path)
+        if self.pooled:
+            self._pool = self.pool or get_pool(
+                self.db_path, max_size=self.pool_size, read_only=self.single_writer
+            )
+            self.conn = self._pool.acquire()
+            return self
         try:
-            self.conn = sqlite3.connect(self.db_path)
+            if self.single_writer:
+                self.conn = connect_read_only(self.db_path)
+            else:
+                self.conn = sqlite3.connect(self.db_path)
             self.conn.row_factory = sqlite3.Row
             console.log(
                 f"[bold green]Database connection opened to:[/bold green] [cyan]{self.db_path}[/cyan]"
@@ -30,57 +91,282 @@ class DatabaseManager:
 
     def __exit__(self, exc_type, exc_val, exc_tb):
         """Closes the database connection."""
-        if self.conn:
+        self._writer = None
+        if self._pool is not None:
+            if self.conn:
+                self._pool.release(self.conn)
+            self.conn = None
+            self._pool = None
+        elif self.conn:
             self.conn.close()
             console.log("[bold green]Database connection closed.[/bold green]")
 
+    @contextmanager
+    def transaction(self):
+        """
+        Groups every write made inside the block into a single commit.
+
+        The transaction is rolled back if the block raises. Nested calls join the
+        outermost transaction. In single-writer mode the writer connection is
+        leased for the duration of the block, so reads inside it see its writes.
+        """
+        if self._transaction_depth:
+            self._transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self._transaction_depth -= 1
+            return
+
+        if self._writer is None:
+            with self._begin():
+                yield self
+            return
+
+        with self._writer.lease() as write_conn:
+            read_conn, self.conn = self.conn, write_conn
+            try:
+                with self._begin():
+                    yield self
+            finally:
+                self.conn = read_conn
+
+    @contextmanager
+    def _begin(self):
+        """Runs the block in an explicit transaction on the current connection."""
+        if not self.conn.in_transaction:
+            self.conn.execute("BEGIN")
+        self._transaction_depth = 1
+        try:
+            yield self
+        except BaseException:
+            self.conn.rollback()
+            raise
+        else:
+            self.conn.commit()
+            for tables in self._pending_invalidations:
+                self.cache.invalidate_tables(tables)
+        finally:
+            self._transaction_depth = 0
+            self._pending_invalidations = []
+
+    def _invalidate(self, query, params=()):
+        """Drops cached results for the tables query writes to, once committed."""
+        if self.cache is None:
+            return
+        tables = self.cache.tables_for(self.conn, query, params)[1]
+        if self._transaction_depth:
+            self._pending_invalidations.append(tables)
+        else:
+            self.cache.invalidate_tables(tables)
+
     def execute_query(self, query, params=()):
-        """Executes a given SQL query (e.g., INSERT, UPDATE, DELETE)."""
+        """
+        Executes a given SQL query (e.g., INSERT, UPDATE, DELETE).
+
+        The change is committed immediately unless a transaction() is active.
+        In single-writer mode it is group-committed by the writer thread and a
+        WriteResult with lastrowid and rowcount is returned instead of a cursor.
+        """
+        started = perf_counter() if self.stats.enabled else None
+        if self._writer is not None and not self._transaction_depth:
+            try:
+                result = self._writer.execute(query, params)
+            except sqlite3.Error as e:
+                console.log(f"[bold red]Query failed:[/bold red] {e}")
+                raise
+        else:
+            try:
+                result = self.conn.cursor()
+                result.execute(query, params)
+                if not self._transaction_depth:
+                    self.conn.commit()
+            except sqlite3.Error as e:
+                console.log(f"[bold red]Query failed:[/bold red] {e}")
+                if not self._transaction_depth:
+                    self.conn.rollback()
+                raise
+        self._invalidate(query, params)
+        if started is not None:
+            self.stats.record(
+                query, perf_counter() - started, max(result.rowcount, 0), self.conn, params
+            )
+        return result
+
+    def executemany(self, query, seq_of_params, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Executes a query once per parameter set and returns the total row count.
+
+        Parameters are consumed chunk_size at a time, so generators of any length
+        can be passed. Outside a transaction() each chunk is committed on its own;
+        inside one, everything is committed together when the block exits.
+        """
+        if chunk_size < 1:
+            raise ValueError("chunk_size must be at least 1")
+        params_iter = iter(seq_of_params)
+        via_writer = self._writer is not None and not self._transaction_depth
+        started = perf_counter() if self.stats.enabled else None
+        total = 0
+        first_params = None
         try:
             cursor = self.conn.cursor()
-            cursor.execute(query, params)
-            self.conn.commit()
-            return cursor
+            while True:
+                chunk = list(islice(params_iter, chunk_size))
+                if not chunk:
+                    break
+                if first_params is None:
+                    first_params = chunk[0]
+                if via_writer:
+                    total += self._writer.submit_many(query, chunk).result()
+                    continue
+                cursor.executemany(query, chunk)
+                total += cursor.rowcount
+                if not self._transaction_depth:
+                    self.conn.commit()
+            if first_params is not None:
+                self._invalidate(query, first_params)
+            if started is not None:
+                self.stats.record(query, perf_counter() - started, total)
+            return total
         except sqlite3.Error as e:
-            console.log(f"[bold red]Query failed:[/bold red] {e}")
-            self.conn.rollback()
+            console.log(f"[bold red]Batch query failed:[/bold red] {e}")
+            if not self._transaction_depth:
+                self.conn.rollback()
             raise
 
+    def bulk_insert(self, table_name, columns, rows, chunk_size=DEFAULT_CHUNK_SIZE):
+        """Inserts many rows of values for the given columns via executemany()."""
+        placeholders = ", ".join("?" for _ in columns)
+        query = f"INSERT INTO {table_name} ({', '.join(columns)}) VALUES ({placeholders})"
+        return self.executemany(query, rows, chunk_size=chunk_size)
+
+    def _read(self, query, params, fetch):
+        """Serves a read from the result cache, falling back to fetch on a miss."""
+        cache = self.cache
+        if cache is None or self._transaction_depth:
+            return fetch(query, params)
+        tables = cache.tables_for(self.conn, query, params)[0]
+        key = cache.make_key(query, params) if tables else None
+        if key is None:
+            return fetch(query, params)
+        value = cache.get(key)
+        if value is MISS:
+            snapshot = cache.snapshot(tables)
+            value = fetch(query, params)
+            cache.put(key, tables, value, snapshot)
+        return value
+
     def fetchone(self, query, params=()):
         """Executes a query and fetches one result."""
+        return self._read(query, params, self._fetchone)
+
+    def fetchall(self, query, params=()):
+        """Executes a query and fetches all results."""
+        rows = self._read(query, params, self._fetchall)
+        return rows if self.cache is None else list(rows)
+
+    def _fetchone(self, query, params):
+        started = perf_counter() if self.stats.enabled else None
         try:
             cursor = self.conn.cursor()
             cursor.execute(query, params)
-            return cursor.fetchone()
+            row = cursor.fetchone()
+            if started is not None:
+                rows = 0 if row is None else 1
+                self.stats.record(query, perf_counter() - started, rows, self.conn, params)
+            return row
         except sqlite3.Error as e:
             console.log(f"[bold red]Fetch one failed:[/bold red] {e}")
             raise
 
-    def fetchall(self, query, params=()):
-        """Executes a query and fetches all results."""
+    def _fetchall(self, query, params):
+        started = perf_counter() if self.stats.enabled else None
         try:
             cursor = self.conn.cursor()
             cursor.execute(query, params)
-            return cursor.fetchall()
+            rows = cursor.fetchall()
+            if started is not None:
+                self.stats.record(query, perf_counter() - started, len(rows), self.conn, params)
+            return rows
         except sqlite3.Error as e:
             console.log(f"[bold red]Fetch all failed:[/bold red] {e}")
             raise
 
+    def iter_rows(self, query, params=(), chunk_size=DEFAULT_FETCH_SIZE, row_type="row"):
+        """
+        Executes a query and yields its results in fetchmany() chunks.
+
+        Only chunk_size rows are held at a time, so arbitrarily large result sets
+        stream in constant memory. row_type selects what is yielded: "row" for
+        sqlite3.Row, "tuple" for plain tuples, or "named" for namedtuples built
+        from the result columns.
+        """
+        if row_type not in ROW_TYPES:
+            raise ValueError(f"row_type must be one of {ROW_TYPES}")
+        timed = self.stats.enabled
+        elapsed = 0.0
+        rows = 0
+        try:
+            started = perf_counter() if timed else None
+            cursor = self.conn.cursor()
+            if row_type != "row":
+                cursor.row_factory = None
+            cursor.execute(query, params)
+            make_row = None
+            if row_type == "named":
+                fields = [column[0] for column in cursor.description]
+                make_row = namedtuple("Row", fields, rename=True)._make
+            if timed:
+                elapsed = perf_counter() - started
+            while True:
+                if timed:
+                    started = perf_counter()
+                chunk = cursor.fetchmany(chunk_size)
+                if timed:
+                    elapsed += perf_counter() - started
+                    rows += len(chunk)
+                if not chunk:
+                    break
+                if make_row:
+                    yield from map(make_row, chunk)
+                else:
+                    yield from chunk
+            if timed:
+                self.stats.record(query, elapsed, rows, self.conn, params)
+        except sqlite3.Error as e:
+            console.log(f"[bold red]Row iteration failed:[/bold red] {e}")
+            raise
+
     def create_table(self, table_name, schema):
         """Creates a table if it doesn't already exist."""
         query = f"CREATE TABLE IF NOT EXISTS {table_name} ({schema})"
         self.execute_query(query)
         console.log(f"Table [bold cyan]'{table_name}'[/bold cyan] created or already exists.")
 
+    def create_index(self, table_name, columns, index_name=None, unique=False):
+        """Creates an index on the given columns if it doesn't already exist."""
+        self.execute_query(create_index_sql(table_name, columns, index_name, unique))
+        console.log(f"Index on [bold cyan]'{table_name}'[/bold cyan] {columns} created or already exists.")
+
 
 @contextmanager
-def get_sqlite_connection(db_path):
+def get_sqlite_connection(db_path, pooled=False):
     """
     A context manager for a simple, one-off SQLite database connection.
 
     This is suitable for simple scripts or functions where a full DatabaseManager
-    class might be overkill.
+    class might be overkill. With pooled=True the connection is borrowed from
+    the shared pool for db_path and returned to it afterwards.
     """
+    if pooled:
+        try:
+            with get_pool(db_path).connection() as conn:
+                yield conn
+        except sqlite3.Error as e:
+            console.log(f"[bold red]Database error:[/bold red] {e}")
+            raise
+        return
+
     conn = None
     try:
         conn = sqlite3.connect(db_path)
@@ -0,0 +1,138 @@
+# libs/database_utils/src/database_utils/instrumentation.py
+
+import json
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_SLOW_QUERY_THRESHOLD = 0.1
+DEFAULT_MAX_SLOW_QUERIES = 100
+
+_STRING_LITERAL = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL = re.compile(r"\b\d+(?:\.\d+)?\b")
+_PLACEHOLDER_LIST = re.compile(r"\(\s*\?(?:\s*,\s*\?)+\s*\)")
+_WHITESPACE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=1024)
+def normalize_sql(query):
+    """Collapses whitespace and literals so equivalent queries share one key."""
+    query = _STRING_LITERAL.sub("?", query)
+    query = _NUMBER_LITERAL.sub("?", query)
+    query = _PLACEHOLDER_LIST.sub("(?, ...)", query)
+    return _WHITESPACE.sub(" ", query).strip().rstrip(";")
+
+
+class QueryStats:
+    """
+    Aggregates per-query timings and captures plans for slow queries.
+
+    Disabled instances cost a single attribute check per query, so a shared
+    instance can stay wired into every DatabaseManager in production and be
+    switched on when needed.
+    """
+
+    def __init__(
+        self,
+        enabled=False,
+        slow_query_threshold=DEFAULT_SLOW_QUERY_THRESHOLD,
+        max_slow_queries=DEFAULT_MAX_SLOW_QUERIES,
+    ):
+        self.enabled = enabled
+        self.slow_query_threshold = slow_query_threshold
+        self._lock = threading.Lock()
+        self._queries = {}
+        self._slow_queries = deque(maxlen=max_slow_queries)
+
+    def configure(self, enabled=True, slow_query_threshold=None):
+        """Turns collection on or off and optionally changes the slow threshold."""
+        if slow_query_threshold is not None:
+            self.slow_query_threshold = slow_query_threshold
+        self.enabled = enabled
+
+    def record(self, query, elapsed, rows, conn=None, params=()):
+        """Records one execution; slow ones also get their query plan captured."""
+        key = normalize_sql(query)
+        with self._lock:
+            entry = self._queries.get(key)
+            if entry is None:
+                entry = self._queries[key] = {
+                    "count": 0,
+                    "total_time": 0.0,
+                    "max_time": 0.0,
+                    "rows": 0,
+                    "slow": 0,
+                }
+            entry["count"] += 1
+            entry["total_time"] += elapsed
+            entry["rows"] += rows
+            if elapsed > entry["max_time"]:
+                entry["max_time"] = elapsed
+            is_slow = elapsed >= self.slow_query_threshold
+            if is_slow:
+                entry["slow"] += 1
+
+        if is_slow:
+            plan = self._explain(conn, query, params)
+            console.log(
+                f"[bold yellow]Slow query ({elapsed * 1000:.1f} ms):[/bold yellow] {key}"
+            )
+            with self._lock:
+                self._slow_queries.append(
+                    {
+                        "query": key,
+                        "elapsed": elapsed,
+                        "rows": rows,
+                        "plan": plan,
+                        "recorded_at": time.time(),
+                    }
+                )
+
+    @staticmethod
+    def _explain(conn, query, params):
+        if conn is None:
+            return []
+        try:
+            return [row[-1] for row in conn.execute(f"EXPLAIN QUERY PLAN {query}", params)]
+        except sqlite3.Error:
+            return []
+
+    def snapshot(self):
+        """Returns aggregated stats per normalized query plus recent slow queries."""
+        with self._lock:
+            queries = {
+                key: {**entry, "avg_time": entry["total_time"] / entry["count"]}
+                for key, entry in self._queries.items()
+            }
+            slow_queries = list(self._slow_queries)
+        return {
+            "enabled": self.enabled,
+            "slow_query_threshold": self.slow_query_threshold,
+            "queries": queries,
+            "slow_queries": slow_queries,
+        }
+
+    def to_json(self, indent=2):
+        """Returns snapshot() serialized as JSON."""
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def dump(self, path):
+        """Writes snapshot() as JSON to path."""
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(self.to_json())
+
+    def reset(self):
+        """Discards everything collected so far."""
+        with self._lock:
+            self._queries.clear()
+            self._slow_queries.clear()
+
+
+query_stats = QueryStats()
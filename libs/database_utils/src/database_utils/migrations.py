@@ -0,0 +1,137 @@
+# libs/database_utils/src/database_utils/migrations.py
+
+import re
+from collections import namedtuple
+
+from rich.console import Console
+
+from .instrumentation import query_stats
+
+console = Console()
+
+MIGRATIONS_TABLE = "schema_migrations"
+
+Migration = namedtuple("Migration", ["version", "description", "statements"])
+
+_WHERE_TARGET = re.compile(
+    r"^(?:SELECT\b.*?\bFROM|UPDATE|DELETE\s+FROM)\s+(\w+)\b(.*?)\bWHERE\b(.*)$",
+    re.IGNORECASE | re.DOTALL,
+)
+_WHERE_COLUMN = re.compile(
+    r"(?:\b\w+\.)?\b(\w+)\s*(?:=|<|>|!=|<>|\bIN\b|\bLIKE\b|\bGLOB\b|\bMATCH\b|\bIS\b|\bBETWEEN\b)",
+    re.IGNORECASE,
+)
+_CLAUSE_END = re.compile(r"\b(?:ORDER\s+BY|GROUP\s+BY|LIMIT|RETURNING)\b", re.IGNORECASE)
+
+
+def create_index_sql(table_name, columns, index_name=None, unique=False):
+    """Builds an idempotent CREATE INDEX statement for the given columns."""
+    if isinstance(columns, str):
+        columns = (columns,)
+    index_name = index_name or f"idx_{table_name}_{'_'.join(columns)}"
+    kind = "UNIQUE INDEX" if unique else "INDEX"
+    return (
+        f"CREATE {kind} IF NOT EXISTS {index_name} "
+        f"ON {table_name} ({', '.join(columns)})"
+    )
+
+
+def applied_versions(db):
+    """Returns the set of migration versions already recorded in the database."""
+    db.create_table(
+        MIGRATIONS_TABLE,
+        "version INTEGER PRIMARY KEY, description TEXT, "
+        "applied_at TEXT NOT NULL DEFAULT CURRENT_TIMESTAMP",
+    )
+    return {row[0] for row in db.iter_rows(f"SELECT version FROM {MIGRATIONS_TABLE}")}
+
+
+def apply_migrations(db, migrations):
+    """
+    Applies every migration newer than what the database has recorded.
+
+    Each migration runs in its own transaction together with the row that
+    records it, so a failed migration leaves no partial schema behind.
+    Statements may be SQL strings or callables that receive the manager.
+    """
+    versions = [migration.version for migration in migrations]
+    if len(set(versions)) != len(versions):
+        raise ValueError("Migration versions must be unique.")
+
+    done = applied_versions(db)
+    applied = []
+    for migration in sorted(migrations, key=lambda m: m.version):
+        if migration.version in done:
+            continue
+        with db.transaction():
+            for statement in migration.statements:
+                if callable(statement):
+                    statement(db)
+                else:
+                    db.execute_query(statement)
+            db.execute_query(
+                f"INSERT INTO {MIGRATIONS_TABLE} (version, description) VALUES (?, ?)",
+                (migration.version, migration.description),
+            )
+        console.log(
+            f"Applied migration [bold cyan]{migration.version}[/bold cyan]: "
+            f"{migration.description}"
+        )
+        applied.append(migration.version)
+    return applied
+
+
+def indexed_columns(db, table_name):
+    """Returns the columns that lead an index (or are the rowid) on a table."""
+    columns = {"rowid"}
+    for column in db.fetchall(f"PRAGMA table_info({table_name})"):
+        if column["pk"] == 1 and column["type"].upper() == "INTEGER":
+            columns.add(column["name"])
+    for index in db.fetchall(f"PRAGMA index_list({table_name})"):
+        info = db.fetchall(f"PRAGMA index_info({index['name']})")
+        leading = [column["name"] for column in info if column["seqno"] == 0]
+        columns.update(name for name in leading if name)
+    return columns
+
+
+def where_columns(query):
+    """Returns (table, columns) filtered on by a single-table query, or None."""
+    match = _WHERE_TARGET.match(query.strip())
+    if match is None or re.search(r"\bJOIN\b", match.group(2), re.IGNORECASE):
+        return None
+    clause = _CLAUSE_END.split(match.group(3), maxsplit=1)[0]
+    return match.group(1), {name.lower() for name in _WHERE_COLUMN.findall(clause)}
+
+
+def unindexed_where_columns(db, stats=None):
+    """
+    Reports columns used in WHERE clauses of logged queries that no index leads.
+
+    Queries come from stats (the shared query_stats by default), so collection
+    must have been enabled while the workload ran. Each entry names the table,
+    the column, and how often queries filtering on it were executed.
+    """
+    stats = query_stats if stats is None else stats
+    known = {}
+    report = {}
+    for query, entry in stats.snapshot()["queries"].items():
+        target = where_columns(query)
+        if target is None:
+            continue
+        table_name, columns = target
+        if table_name not in known:
+            table_columns = {
+                column["name"].lower()
+                for column in db.fetchall(f"PRAGMA table_info({table_name})")
+            }
+            indexed = {name.lower() for name in indexed_columns(db, table_name)}
+            known[table_name] = (table_columns, indexed)
+        table_columns, indexed = known[table_name]
+        for column in columns & table_columns - indexed:
+            item = report.setdefault(
+                (table_name, column),
+                {"table": table_name, "column": column, "executions": 0, "queries": []},
+            )
+            item["executions"] += entry["count"]
+            item["queries"].append(query)
+    return sorted(report.values(), key=lambda item: item["executions"], reverse=True)
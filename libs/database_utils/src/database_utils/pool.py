@@ -0,0 +1,229 @@
+# libs/database_utils/src/database_utils/pool.py
+
+import os
+import sqlite3
+import threading
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from rich.console import Console
+
+console = Console()
+
+DEFAULT_POOL_SIZE = 5
+DEFAULT_TIMEOUT = 30.0
+DEFAULT_CACHED_STATEMENTS = 256
+DEFAULT_PRAGMAS = {
+    "journal_mode": "WAL",
+    "synchronous": "NORMAL",
+    "cache_size": -64000,  # negative values are KiB, so roughly 64 MB of page cache
+    "mmap_size": 268435456,
+    "busy_timeout": 5000,
+}
+
+
+def connect_read_only(db_path, **kwargs):
+    """Opens a connection that SQLite itself refuses to write through."""
+    uri = Path(db_path).absolute().as_uri() + "?mode=ro"
+    return sqlite3.connect(uri, uri=True, **kwargs)
+
+
+class PoolTimeout(sqlite3.OperationalError):
+    """Raised when no pooled connection becomes available in time."""
+
+
+class ConnectionPool:
+    """A bounded, thread-safe pool of warm SQLite connections for one database file."""
+
+    def __init__(
+        self,
+        db_path,
+        max_size=DEFAULT_POOL_SIZE,
+        timeout=DEFAULT_TIMEOUT,
+        pragmas=None,
+        read_only=False,
+        cached_statements=DEFAULT_CACHED_STATEMENTS,
+    ):
+        if max_size < 1:
+            raise ValueError("max_size must be at least 1")
+        self.db_path = db_path
+        self.max_size = max_size
+        self.timeout = timeout
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self.read_only = read_only
+        self.cached_statements = cached_statements
+        self._idle = []
+        self._created = 0
+        self._closed = False
+        self._cond = threading.Condition()
+        self._stats = {
+            "created": 0,
+            "discarded": 0,
+            "checkouts": 0,
+            "waits": 0,
+            "wait_time": 0.0,
+            "timeouts": 0,
+        }
+
+    def _connect(self):
+        """Opens a new connection and applies the pool's pragmas once."""
+        options = {
+            "check_same_thread": False,
+            "cached_statements": self.cached_statements,
+        }
+        if self.read_only:
+            conn = connect_read_only(self.db_path, **options)
+        else:
+            conn = sqlite3.connect(self.db_path, **options)
+        conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            if self.read_only and name == "journal_mode":
+                continue
+            conn.execute(f"PRAGMA {name} = {value}")
+        console.log(
+            f"[bold green]Pooled connection opened to:[/bold green] [cyan]{self.db_path}[/cyan]"
+        )
+        return conn
+
+    def acquire(self):
+        """Checks out a connection, opening one or waiting if the pool is exhausted."""
+        with self._cond:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot acquire from a closed pool.")
+            self._stats["checkouts"] += 1
+            if self._idle:
+                return self._idle.pop()
+            if self._created >= self.max_size:
+                self._stats["waits"] += 1
+                started = time.perf_counter()
+                ready = self._cond.wait_for(
+                    lambda: self._idle or self._created < self.max_size or self._closed,
+                    timeout=self.timeout,
+                )
+                self._stats["wait_time"] += time.perf_counter() - started
+                if not ready:
+                    self._stats["timeouts"] += 1
+                    raise PoolTimeout(
+                        f"Timed out after {self.timeout}s waiting for a connection "
+                        f"to {self.db_path}"
+                    )
+                if self._closed:
+                    raise sqlite3.ProgrammingError("Cannot acquire from a closed pool.")
+                if self._idle:
+                    return self._idle.pop()
+            self._created += 1
+            self._stats["created"] += 1
+
+        try:
+            return self._connect()
+        except sqlite3.Error as e:
+            console.log(f"[bold red]Error connecting to database:[/bold red] {e}")
+            self._forget()
+            raise
+
+    def release(self, conn):
+        """Resets a connection and returns it to the pool."""
+        try:
+            if conn.in_transaction:
+                conn.rollback()
+            conn.row_factory = sqlite3.Row
+        except sqlite3.Error:
+            conn.close()
+            self._forget()
+            return
+
+        with self._cond:
+            if self._closed:
+                conn.close()
+                self._created -= 1
+                return
+            self._idle.append(conn)
+            self._cond.notify()
+
+    def _forget(self):
+        """Frees the slot held by a connection that was discarded."""
+        with self._cond:
+            self._created -= 1
+            self._stats["discarded"] += 1
+            self._cond.notify()
+
+    @contextmanager
+    def connection(self):
+        """A context manager that checks a connection out and back in."""
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+    def close(self):
+        """Closes all idle connections; checked-out ones are closed on release."""
+        with self._cond:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._created -= len(idle)
+            self._cond.notify_all()
+        for conn in idle:
+            conn.close()
+
+    def stats(self):
+        """Returns a snapshot of the pool's counters for sizing decisions."""
+        with self._cond:
+            return {
+                **self._stats,
+                "max_size": self.max_size,
+                "open": self._created,
+                "idle": len(self._idle),
+                "in_use": self._created - len(self._idle),
+            }
+
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def _pool_key(
+    db_path,
+    max_size=DEFAULT_POOL_SIZE,
+    timeout=DEFAULT_TIMEOUT,
+    pragmas=None,
+    read_only=False,
+    cached_statements=DEFAULT_CACHED_STATEMENTS,
+):
+    pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+    return (
+        os.path.abspath(os.fspath(db_path)),
+        max_size,
+        timeout,
+        tuple(sorted(pragmas.items())),
+        read_only,
+        cached_statements,
+    )
+
+
+def get_pool(db_path, **kwargs):
+    """
+    Returns the shared pool for db_path and this configuration, creating it on
+    first use.
+
+    Pools are keyed on their whole configuration (max_size, timeout, pragmas,
+    read_only, cached_statements), not just the path: callers asking for the
+    same settings share one pool, and a caller asking for different ones gets
+    its own, so no caller's settings are ever silently ignored.
+    """
+    key = _pool_key(db_path, **kwargs)
+    with _pools_lock:
+        pool = _pools.get(key)
+        if pool is None or pool._closed:
+            pool = _pools[key] = ConnectionPool(db_path, **kwargs)
+        return pool
+
+
+def close_all_pools():
+    """Closes every shared pool, e.g. on application shutdown."""
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
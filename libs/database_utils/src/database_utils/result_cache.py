@@ -0,0 +1,216 @@
+# libs/database_utils/src/database_utils/result_cache.py
+
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+DEFAULT_MAX_ENTRIES = 1024
+DEFAULT_TTL = 60.0
+
+_READ_ACTIONS = {
+    sqlite3.SQLITE_READ,
+    sqlite3.SQLITE_SELECT,
+    sqlite3.SQLITE_FUNCTION,
+    sqlite3.SQLITE_RECURSIVE,
+}
+_WRITE_ACTIONS = {sqlite3.SQLITE_INSERT, sqlite3.SQLITE_UPDATE, sqlite3.SQLITE_DELETE}
+
+MISS = object()
+
+
+def statement_tables(conn, query, params=()):
+    """
+    Returns (reads, writes) for a statement, as SQLite itself resolves them.
+
+    reads is the lower-cased set of tables a pure read depends on, or None if
+    the statement shouldn't be cached (it writes, touches SQLite's own schema
+    tables or does anything but read rows). writes is the set of tables a
+    row-level write changes, including those written by the triggers it fires,
+    or None when that can't be bounded (schema changes, PRAGMAs). Returns None
+    if the statement doesn't compile on conn.
+
+    The statement is only compiled (as an EXPLAIN) with an authorizer collecting
+    what it touches; it is never run.
+    """
+    actions = []
+
+    def collect(action, arg1, arg2, db_name, source):
+        actions.append((action, arg1))
+        return sqlite3.SQLITE_OK
+
+    conn.set_authorizer(collect)
+    try:
+        conn.execute(f"EXPLAIN {query}", params).fetchall()
+    except sqlite3.Error:
+        return None
+    finally:
+        # Setting or clearing an authorizer expires prepared statements, so the
+        # EXPLAIN is always recompiled and reported in full.
+        conn.set_authorizer(None)
+
+    kinds = {action for action, _ in actions}
+    touched = frozenset(table.lower() for _, table in actions if table)
+    reads = writes = None
+    if (
+        kinds <= _READ_ACTIONS
+        and touched
+        and not any(table.startswith("sqlite_") for table in touched)
+    ):
+        reads = touched
+    if kinds <= _READ_ACTIONS | _WRITE_ACTIONS:
+        writes = frozenset(
+            table.lower() for action, table in actions if action in _WRITE_ACTIONS
+        )
+    return reads, writes
+
+
+class ResultCache:
+    """
+    A thread-safe LRU/TTL cache of query results for one database.
+
+    Entries are keyed on (SQL, params) and remember the tables they read, so a
+    write to a table drops every cached result that depends on it. Which tables
+    a statement reads or writes comes from SQLite's authorizer (see
+    statement_tables), so joins of any form and writes made by triggers are
+    accounted for; a statement's tables are worked out once and remembered.
+    Schema changes drop everything, including those remembered tables.
+
+    If on_invalidate is given, it is called with the table (None for everything)
+    after each invalidation, on whichever thread committed the write, so other
+    caches derived from the same data can follow along.
+
+    The cache only sees writes made through DatabaseManagers that share it, so
+    it must not be used for databases that other processes write to, or whose
+    schema (triggers included) other connections change.
+    """
+
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES, ttl=DEFAULT_TTL, on_invalidate=None):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.on_invalidate = on_invalidate
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._statements = OrderedDict()
+        self._by_table = {}
+        self._versions = {}
+        self._epoch = 0
+        self._stats = {
+            "hits": 0,
+            "misses": 0,
+            "evictions": 0,
+            "expirations": 0,
+            "invalidations": 0,
+        }
+
+    @staticmethod
+    def make_key(query, params):
+        """Returns a hashable cache key, or None if params can't be hashed."""
+        key = (query, tuple(params) if isinstance(params, list) else params)
+        try:
+            hash(key)
+        except TypeError:
+            return None
+        return key
+
+    def tables_for(self, conn, query, params=()):
+        """Returns (reads, writes) for query, analysing it on conn the first time."""
+        with self._lock:
+            tables = self._statements.get(query)
+            if tables is not None:
+                self._statements.move_to_end(query)
+                return tables
+        tables = statement_tables(conn, query, params)
+        if tables is None:
+            return None, None
+        with self._lock:
+            self._statements[query] = tables
+            while len(self._statements) > self.max_entries:
+                self._statements.popitem(last=False)
+        return tables
+
+    def get(self, key):
+        """Returns the cached value for key, or MISS."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self._stats["misses"] += 1
+                return MISS
+            value, tables, expires = entry
+            if expires is not None and expires < time.monotonic():
+                self._remove(key)
+                self._stats["expirations"] += 1
+                self._stats["misses"] += 1
+                return MISS
+            self._entries.move_to_end(key)
+            self._stats["hits"] += 1
+            return value
+
+    def snapshot(self, tables):
+        """Captures table versions before a read so a racing write can be detected."""
+        with self._lock:
+            return self._snapshot(tables)
+
+    def _snapshot(self, tables):
+        return (self._epoch,) + tuple(self._versions.get(table, 0) for table in tables)
+
+    def put(self, key, tables, value, snapshot):
+        """Stores value unless one of its tables was written since snapshot()."""
+        with self._lock:
+            if snapshot != self._snapshot(tables):
+                return
+            if key in self._entries:
+                self._remove(key)
+            expires = time.monotonic() + self.ttl if self.ttl else None
+            self._entries[key] = (value, tables, expires)
+            for table in tables:
+                self._by_table.setdefault(table, set()).add(key)
+            while len(self._entries) > self.max_entries:
+                self._remove(next(iter(self._entries)))
+                self._stats["evictions"] += 1
+
+    def invalidate(self, table=None):
+        """Drops results that read table, or everything when table is None."""
+        with self._lock:
+            self._stats["invalidations"] += 1
+            if table is None:
+                self._epoch += 1
+                self._entries.clear()
+                self._statements.clear()
+                self._by_table.clear()
+            else:
+                self._versions[table] = self._versions.get(table, 0) + 1
+                for key in self._by_table.pop(table, ()):
+                    if key in self._entries:
+                        self._remove(key)
+        if self.on_invalidate is not None:
+            self.on_invalidate(table)
+
+    def invalidate_tables(self, tables):
+        """Drops results that read any of tables, or everything when tables is None."""
+        if tables is None:
+            self.invalidate()
+            return
+        for table in tables:
+            self.invalidate(table)
+
+    def _remove(self, key):
+        _, tables, _ = self._entries.pop(key)
+        for table in tables:
+            keys = self._by_table.get(table)
+            if keys is not None:
+                keys.discard(key)
+
+    def stats(self):
+        """Returns hit/miss/eviction counters and the current size."""
+        with self._lock:
+            lookups = self._stats["hits"] + self._stats["misses"]
+            return {
+                **self._stats,
+                "entries": len(self._entries),
+                "hit_rate": self._stats["hits"] / lookups if lookups else 0.0,
+            }
+
+    def clear(self):
+        """Drops every entry, keeping the counters."""
+        self.invalidate()
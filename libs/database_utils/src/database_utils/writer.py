@@ -0,0 +1,268 @@
+# libs/database_utils/src/database_utils/writer.py
+
+import os
+import queue
+import sqlite3
+import threading
+from collections import namedtuple
+from concurrent.futures import Future
+from contextlib import contextmanager
+
+from rich.console import Console
+
+from .pool import DEFAULT_PRAGMAS
+
+console = Console()
+
+DEFAULT_MAX_BATCH = 256
+
+WriteResult = namedtuple("WriteResult", ["lastrowid", "rowcount"])
+
+_STOP = object()
+
+
+class _Lease:
+    """A request for exclusive use of the writer connection on the caller's thread."""
+
+    def __init__(self):
+        self.granted = threading.Event()
+        self.released = threading.Event()
+
+
+class SerializedWriter:
+    """
+    Funnels writes from many threads through one connection on a dedicated thread.
+
+    Queued writes are coalesced into group commits of up to max_batch statements.
+    Each statement runs inside its own savepoint, so a failing statement only
+    fails its own future while the rest of the group still commits.
+    """
+
+    def __init__(self, db_path, max_batch=DEFAULT_MAX_BATCH, pragmas=None):
+        if max_batch < 1:
+            raise ValueError("max_batch must be at least 1")
+        self.db_path = db_path
+        self.max_batch = max_batch
+        self.pragmas = DEFAULT_PRAGMAS if pragmas is None else pragmas
+        self._queue = queue.SimpleQueue()
+        self._closed = False
+        self._lock = threading.Lock()
+        self._stats = {
+            "writes": 0,
+            "failed": 0,
+            "commits": 0,
+            "leases": 0,
+            "largest_batch": 0,
+        }
+
+        self.conn = sqlite3.connect(db_path, isolation_level=None, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        for name, value in self.pragmas.items():
+            self.conn.execute(f"PRAGMA {name} = {value}")
+        self._thread = threading.Thread(
+            target=self._run, name=f"sqlite-writer:{db_path}", daemon=True
+        )
+        self._thread.start()
+        console.log(f"[bold green]Writer thread started for:[/bold green] [cyan]{db_path}[/cyan]")
+
+    def submit(self, query, params=()):
+        """Queues a single statement and returns a Future for its WriteResult."""
+        return self._put(("one", query, params))
+
+    def submit_many(self, query, seq_of_params):
+        """Queues an executemany() and returns a Future for its total row count."""
+        return self._put(("many", query, list(seq_of_params)))
+
+    def execute(self, query, params=()):
+        """Queues a single statement and waits for its WriteResult."""
+        return self.submit(query, params).result()
+
+    def _put(self, job):
+        future = Future()
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot write through a closed writer.")
+            self._queue.put(job + (future,))
+        return future
+
+    @contextmanager
+    def lease(self):
+        """
+        Lends the writer connection to the calling thread for an explicit transaction.
+
+        Pending writes are committed first and the writer thread waits until the
+        block exits, so statements in the block get real cursors and can read
+        their own uncommitted changes.
+        """
+        lease = _Lease()
+        with self._lock:
+            if self._closed:
+                raise sqlite3.ProgrammingError("Cannot lease a closed writer.")
+            self._queue.put(lease)
+        lease.granted.wait()
+        try:
+            yield self.conn
+        finally:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            lease.released.set()
+
+    def _run(self):
+        while True:
+            job = self._queue.get()
+            batch = [job]
+            while len(batch) < self.max_batch and job is not _STOP:
+                try:
+                    job = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+                batch.append(job)
+
+            group = []
+            try:
+                for job in batch:
+                    if job is _STOP or isinstance(job, _Lease):
+                        self._flush(group)
+                        group = []
+                        if job is _STOP:
+                            self.conn.close()
+                            return
+                        self._grant(job)
+                    else:
+                        group.append(job)
+                self._flush(group)
+            except Exception as e:
+                # Never let the thread die: a dead writer would leave its
+                # transaction open and every later write waiting forever.
+                console.log(f"[bold red]Writer thread error:[/bold red] {e}")
+                self._fail(group, e)
+                if _STOP in batch:
+                    return
+
+    def _flush(self, group):
+        """Commits a group, failing its unresolved futures on any unexpected error."""
+        try:
+            self._commit_group(group)
+        except Exception as e:
+            console.log(f"[bold red]Group commit aborted:[/bold red] {e}")
+            self._fail(group, e)
+
+    def _fail(self, group, error):
+        try:
+            if self.conn.in_transaction:
+                self.conn.rollback()
+        except sqlite3.Error as e:
+            console.log(f"[bold red]Rollback failed:[/bold red] {e}")
+        for *_, future in group:
+            if not future.done():
+                future.set_exception(error)
+                self._stats["failed"] += 1
+
+    def _grant(self, lease):
+        self._stats["leases"] += 1
+        lease.granted.set()
+        lease.released.wait()
+
+    def _commit_group(self, group):
+        """Runs a group of queued writes in one transaction and resolves their futures."""
+        if not group:
+            return
+        results = []
+        try:
+            self.conn.execute("BEGIN IMMEDIATE")
+        except sqlite3.Error as e:
+            console.log(f"[bold red]Group commit could not start:[/bold red] {e}")
+            for *_, future in group:
+                future.set_exception(e)
+            self._stats["failed"] += len(group)
+            return
+
+        for kind, query, params, future in group:
+            try:
+                self.conn.execute("SAVEPOINT write")
+                cursor = self.conn.cursor()
+                if kind == "many":
+                    cursor.executemany(query, params)
+                    result = cursor.rowcount
+                else:
+                    cursor.execute(query, params)
+                    result = WriteResult(cursor.lastrowid, cursor.rowcount)
+                self.conn.execute("RELEASE write")
+                results.append((future, result))
+            except Exception as e:
+                # Binding errors such as OverflowError are not sqlite3.Errors,
+                # but must still fail only this statement.
+                console.log(f"[bold red]Queued write failed:[/bold red] {e}")
+                self.conn.execute("ROLLBACK TO write")
+                self.conn.execute("RELEASE write")
+                future.set_exception(e)
+                self._stats["failed"] += 1
+
+        try:
+            self.conn.execute("COMMIT")
+        except sqlite3.Error as e:
+            console.log(f"[bold red]Group commit failed:[/bold red] {e}")
+            if self.conn.in_transaction:
+                self.conn.rollback()
+            for future, _ in results:
+                future.set_exception(e)
+            self._stats["failed"] += len(results)
+            return
+
+        self._stats["commits"] += 1
+        self._stats["writes"] += len(results)
+        self._stats["largest_batch"] = max(self._stats["largest_batch"], len(group))
+        for future, result in results:
+            future.set_result(result)
+
+    def close(self):
+        """Flushes queued writes, stops the writer thread and closes its connection."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._queue.put(_STOP)
+        self._thread.join()
+
+    def stats(self):
+        """Returns a snapshot of the writer's counters."""
+        return dict(self._stats)
+
+
+_writers = {}
+_writers_lock = threading.Lock()
+
+
+def _writer_config(max_batch=DEFAULT_MAX_BATCH, pragmas=None):
+    return max_batch, DEFAULT_PRAGMAS if pragmas is None else pragmas
+
+
+def get_writer(db_path, **kwargs):
+    """
+    Returns the shared writer for db_path, starting it on first use.
+
+    There is one writer per file, or writes would no longer be serialized, so
+    its configuration (max_batch, pragmas) is fixed by the call that starts it.
+    Later calls without settings get that writer; asking for different
+    settings while it runs raises ValueError instead of silently ignoring them.
+    """
+    key = os.path.abspath(os.fspath(db_path))
+    config = _writer_config(**kwargs)
+    with _writers_lock:
+        writer = _writers.get(key)
+        if writer is None or writer._closed:
+            writer = _writers[key] = SerializedWriter(db_path, **kwargs)
+        elif kwargs and (writer.max_batch, writer.pragmas) != config:
+            raise ValueError(
+                f"The writer for {db_path} is already running with a different configuration."
+            )
+        return writer
+
+
+def close_all_writers():
+    """Stops every shared writer, e.g. on application shutdown."""
+    with _writers_lock:
+        writers = list(_writers.values())
+        _writers.clear()
+    for writer in writers:
+        writer.close()
@@ -0,0 +1,88 @@
+# libs/database_utils/tests/test_async_db.py
+
+import asyncio
+import os
+import threading
+import time
+import unittest
+
+from database_utils.async_db import AsyncDatabase
+from database_utils.db_connector import DatabaseManager
+from database_utils.pool import close_all_pools, get_pool
+
+
+class TestAsyncDatabase(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "test_async.db"
+        self._cleanup()
+        self.db = AsyncDatabase(self.db_path, max_workers=3)
+
+    def tearDown(self):
+        self.db.close()
+        close_all_pools()
+        self._cleanup()
+
+    def _cleanup(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_queries_run_off_the_event_loop(self):
+        async def scenario():
+            loop_thread = threading.get_ident()
+            await self.db.run(lambda db: db.create_table("users", "id INTEGER PRIMARY KEY, name TEXT"))
+            results = await asyncio.gather(
+                *(self.db.execute_query("INSERT INTO users (name) VALUES (?)", (f"u{i}",)) for i in range(20))
+            )
+            worker_thread = await self.db.run(lambda db: threading.get_ident())
+            row = await self.db.fetchone("SELECT COUNT(*) FROM users")
+            rows = await self.db.fetchall("SELECT name FROM users WHERE id = ?", (results[0].lastrowid,))
+            count = await self.db.executemany("DELETE FROM users WHERE id = ?", [(r.lastrowid,) for r in results])
+            return loop_thread, worker_thread, row[0], rows, count
+
+        loop_thread, worker_thread, total, rows, deleted = asyncio.run(scenario())
+        self.assertNotEqual(loop_thread, worker_thread)
+        self.assertEqual(total, 20)
+        self.assertEqual(rows[0]["name"], "u0")
+        self.assertEqual(deleted, 20)
+
+    def test_each_worker_keeps_its_own_connection(self):
+        async def scenario():
+            return await asyncio.gather(*(self.db.run(lambda db: (threading.get_ident(), id(db.conn))) for _ in range(30)))
+
+        pairs = set(asyncio.run(scenario()))
+        threads = {thread for thread, _ in pairs}
+        connections = {conn for _, conn in pairs}
+        self.assertEqual(len(pairs), len(threads))
+        self.assertEqual(len(connections), len(threads))
+
+    def test_workers_do_not_check_out_of_the_shared_pool(self):
+        db = AsyncDatabase(self.db_path, max_workers=4)
+        try:
+            async def scenario():
+                return await asyncio.gather(*(db.fetchone("SELECT 1") for _ in range(20)))
+
+            self.assertEqual(len(asyncio.run(scenario())), 20)
+            # All four workers pin a connection, but none from the shared pool
+            # that a same-sized DatabaseManager checks out of.
+            shared = get_pool(self.db_path, max_size=4)
+            self.assertEqual(shared.stats()["in_use"], 0)
+            with DatabaseManager(self.db_path, pooled=True, pool_size=4) as manager:
+                self.assertEqual(manager.fetchone("SELECT 2")[0], 2)
+        finally:
+            db.close()
+
+    def test_observer_receives_call_durations(self):
+        timings = []
+        db = AsyncDatabase(self.db_path, max_workers=1, observer=timings.append)
+        try:
+            asyncio.run(db.run(lambda manager: time.sleep(0.01)))
+        finally:
+            db.close()
+        self.assertEqual(len(timings), 1)
+        self.assertGreaterEqual(timings[0], 0.01)
+
+
+if __name__ == '__main__':
+    unittest.main()
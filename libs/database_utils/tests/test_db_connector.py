@@ -55,6 +55,56 @@ class TestDatabaseManager(unittest.TestCase):
             self.assertEqual(users[0]["name"], "user1")
             self.assertEqual(users[1]["name"], "user2")
 
+    def test_transaction_commits_once(self):
+        with DatabaseManager(self.db_path) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            with db.transaction():
+                db.execute_query("INSERT INTO users (name) VALUES (?)", ("user1",))
+                db.execute_query("INSERT INTO users (name) VALUES (?)", ("user2",))
+                self.assertTrue(db.conn.in_transaction)
+            self.assertFalse(db.conn.in_transaction)
+            self.assertEqual(len(db.fetchall("SELECT * FROM users")), 2)
+
+    def test_transaction_rolls_back_on_error(self):
+        with DatabaseManager(self.db_path) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            with self.assertRaises(RuntimeError):
+                with db.transaction():
+                    db.execute_query("INSERT INTO users (name) VALUES (?)", ("user1",))
+                    raise RuntimeError("boom")
+            self.assertEqual(len(db.fetchall("SELECT * FROM users")), 0)
+
+    def test_executemany_in_chunks(self):
+        with DatabaseManager(self.db_path) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            rows = ((i, f"user{i}") for i in range(25))
+            count = db.executemany("INSERT INTO users VALUES (?, ?)", rows, chunk_size=10)
+            self.assertEqual(count, 25)
+            self.assertEqual(db.fetchone("SELECT COUNT(*) FROM users")[0], 25)
+
+    def test_bulk_insert_in_transaction(self):
+        with DatabaseManager(self.db_path) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            with db.transaction():
+                db.bulk_insert("users", ("id", "name"), [(1, "a"), (2, "b")])
+            self.assertEqual(db.fetchone("SELECT name FROM users WHERE id = 2")["name"], "b")
+
+    def test_iter_rows(self):
+        with DatabaseManager(self.db_path) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            db.bulk_insert("users", ("id", "name"), [(i, f"user{i}") for i in range(5)])
+            rows = list(db.iter_rows("SELECT * FROM users ORDER BY id", chunk_size=2))
+            self.assertEqual([row["name"] for row in rows], [f"user{i}" for i in range(5)])
+
+            tuples = list(db.iter_rows("SELECT id, name FROM users WHERE id < ?", (2,), row_type="tuple"))
+            self.assertEqual(tuples, [(0, "user0"), (1, "user1")])
+
+            named = next(db.iter_rows("SELECT id, name FROM users", row_type="named"))
+            self.assertEqual((named.id, named.name), (0, "user0"))
+
+            with self.assertRaises(ValueError):
+                list(db.iter_rows("SELECT * FROM users", row_type="dict"))
+
 class TestGetSqliteConnection(unittest.TestCase):
 
     def setUp(self):
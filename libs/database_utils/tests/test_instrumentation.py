@@ -0,0 +1,69 @@
+# libs/database_utils/tests/test_instrumentation.py
+
+import json
+import os
+import unittest
+
+from database_utils.db_connector import DatabaseManager
+from database_utils.instrumentation import QueryStats, normalize_sql
+
+
+class TestQueryStats(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "test_stats.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_normalize_sql(self):
+        self.assertEqual(
+            normalize_sql("SELECT *\n  FROM users WHERE name = 'bob' AND age > 30;"),
+            "SELECT * FROM users WHERE name = ? AND age > ?",
+        )
+        self.assertEqual(
+            normalize_sql("DELETE FROM t1 WHERE id IN (?, ?, ?)"),
+            "DELETE FROM t1 WHERE id IN (?, ...)",
+        )
+
+    def test_disabled_stats_record_nothing(self):
+        stats = QueryStats()
+        with DatabaseManager(self.db_path, stats=stats) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            db.fetchall("SELECT * FROM users")
+        self.assertEqual(stats.snapshot()["queries"], {})
+
+    def test_queries_are_aggregated(self):
+        stats = QueryStats(enabled=True, slow_query_threshold=60)
+        with DatabaseManager(self.db_path, stats=stats) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            db.bulk_insert("users", ("id", "name"), [(1, "a"), (2, "b"), (3, "c")])
+            db.fetchone("SELECT * FROM users WHERE id = ?", (1,))
+            db.fetchone("SELECT * FROM users WHERE id = ?", (2,))
+            list(db.iter_rows("SELECT * FROM users", chunk_size=2))
+
+        queries = json.loads(stats.to_json())["queries"]
+        lookup = queries["SELECT * FROM users WHERE id = ?"]
+        self.assertEqual(lookup["count"], 2)
+        self.assertEqual(lookup["rows"], 2)
+        self.assertEqual(queries["SELECT * FROM users"]["rows"], 3)
+        self.assertEqual(queries["INSERT INTO users (id, name) VALUES (?, ...)"]["rows"], 3)
+
+    def test_slow_queries_capture_plan(self):
+        stats = QueryStats(enabled=True, slow_query_threshold=0)
+        with DatabaseManager(self.db_path, stats=stats) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            db.fetchall("SELECT * FROM users WHERE name = ?", ("a",))
+        slow = stats.snapshot()["slow_queries"]
+        plan = next(entry["plan"] for entry in slow if entry["query"].startswith("SELECT"))
+        self.assertTrue(any("SCAN" in step for step in plan))
+
+        stats.reset()
+        self.assertEqual(stats.snapshot()["slow_queries"], [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,73 @@
+# libs/database_utils/tests/test_migrations.py
+
+import os
+import sqlite3
+import unittest
+
+from database_utils.db_connector import DatabaseManager
+from database_utils.instrumentation import QueryStats
+from database_utils.migrations import (
+    Migration,
+    apply_migrations,
+    applied_versions,
+    indexed_columns,
+    unindexed_where_columns,
+    where_columns,
+)
+
+MIGRATIONS = [
+    Migration(1, "Create users", ["CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT, age INTEGER)"]),
+    Migration(2, "Index users by name", [lambda db: db.create_index("users", ("name",))]),
+]
+
+
+class TestMigrations(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "test_migrations.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_apply_migrations_once(self):
+        with DatabaseManager(self.db_path) as db:
+            self.assertEqual(apply_migrations(db, MIGRATIONS), [1, 2])
+            self.assertEqual(apply_migrations(db, MIGRATIONS), [])
+            self.assertEqual(applied_versions(db), {1, 2})
+            self.assertEqual(indexed_columns(db, "users"), {"rowid", "id", "name"})
+
+    def test_failed_migration_is_rolled_back(self):
+        broken = MIGRATIONS[:1] + [
+            Migration(2, "Broken", ["ALTER TABLE users ADD COLUMN email TEXT", "NOT SQL"]),
+        ]
+        with DatabaseManager(self.db_path) as db:
+            with self.assertRaises(sqlite3.Error):
+                apply_migrations(db, broken)
+            self.assertEqual(applied_versions(db), {1})
+            columns = [row["name"] for row in db.fetchall("PRAGMA table_info(users)")]
+            self.assertNotIn("email", columns)
+
+    def test_where_columns(self):
+        self.assertEqual(
+            where_columns("SELECT * FROM users WHERE age > ? AND name = ? ORDER BY id LIMIT ?"),
+            ("users", {"age", "name"}),
+        )
+        self.assertEqual(where_columns("DELETE FROM users WHERE id IN (?, ...)"), ("users", {"id"}))
+        self.assertIsNone(where_columns("SELECT * FROM users"))
+
+    def test_unindexed_where_columns(self):
+        stats = QueryStats(enabled=True, slow_query_threshold=60)
+        with DatabaseManager(self.db_path, stats=stats) as db:
+            apply_migrations(db, MIGRATIONS)
+            db.fetchall("SELECT * FROM users WHERE age > ?", (30,))
+            db.fetchall("SELECT * FROM users WHERE name = ?", ("a",))
+            db.fetchone("SELECT * FROM users WHERE id = ?", (1,))
+            report = unindexed_where_columns(db, stats)
+        self.assertEqual([(item["table"], item["column"]) for item in report], [("users", "age")])
+
+
+if __name__ == '__main__':
+    unittest.main()
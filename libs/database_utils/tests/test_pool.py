@@ -0,0 +1,106 @@
+# libs/database_utils/tests/test_pool.py
+
+import os
+import threading
+import unittest
+
+from database_utils.db_connector import DatabaseManager, get_sqlite_connection
+from database_utils.pool import (
+    DEFAULT_PRAGMAS,
+    ConnectionPool,
+    PoolTimeout,
+    close_all_pools,
+    get_pool,
+)
+
+
+class TestConnectionPool(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "test_pool.db"
+        self._cleanup()
+
+    def tearDown(self):
+        close_all_pools()
+        self._cleanup()
+
+    def _cleanup(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_connections_are_reused(self):
+        pool = ConnectionPool(self.db_path, max_size=2)
+        with pool.connection() as first:
+            pass
+        with pool.connection() as second:
+            self.assertIs(first, second)
+        stats = pool.stats()
+        self.assertEqual(stats["created"], 1)
+        self.assertEqual(stats["checkouts"], 2)
+        pool.close()
+
+    def test_pragmas_applied(self):
+        pool = ConnectionPool(self.db_path)
+        with pool.connection() as conn:
+            self.assertEqual(conn.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+            self.assertEqual(conn.execute("PRAGMA synchronous").fetchone()[0], 1)
+        pool.close()
+
+    def test_release_rolls_back_open_transaction(self):
+        pool = ConnectionPool(self.db_path, max_size=1)
+        with pool.connection() as conn:
+            conn.execute("CREATE TABLE users (name TEXT)")
+            conn.commit()
+            conn.execute("INSERT INTO users VALUES ('pending')")
+            self.assertTrue(conn.in_transaction)
+        with pool.connection() as conn:
+            self.assertFalse(conn.in_transaction)
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 0)
+        pool.close()
+
+    def test_exhausted_pool_waits_and_times_out(self):
+        pool = ConnectionPool(self.db_path, max_size=1, timeout=0.05)
+        conn = pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+
+        threading.Timer(0.02, pool.release, args=(conn,)).start()
+        pool.timeout = 5
+        self.assertIs(pool.acquire(), conn)
+        stats = pool.stats()
+        self.assertEqual(stats["waits"], 2)
+        self.assertEqual(stats["timeouts"], 1)
+        self.assertGreater(stats["wait_time"], 0)
+        pool.release(conn)
+        pool.close()
+
+    def test_pooled_database_manager(self):
+        with DatabaseManager(self.db_path, pooled=True) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            db.execute_query("INSERT INTO users (name) VALUES (?)", ("test_user",))
+            first = db.conn
+        self.assertIsNone(db.conn)
+        with DatabaseManager(self.db_path, pooled=True) as db:
+            self.assertIs(db.conn, first)
+            self.assertEqual(db.fetchone("SELECT name FROM users")["name"], "test_user")
+        self.assertEqual(get_pool(self.db_path).stats()["created"], 1)
+
+    def test_shared_pools_are_keyed_on_configuration(self):
+        small = get_pool(self.db_path, max_size=2)
+        self.assertIs(get_pool(self.db_path, max_size=2), small)
+        self.assertIsNot(get_pool(self.db_path, max_size=4), small)
+        self.assertEqual(get_pool(self.db_path, max_size=4).max_size, 4)
+        self.assertIs(get_pool(self.db_path), get_pool(self.db_path, pragmas=DEFAULT_PRAGMAS))
+        with DatabaseManager(self.db_path, pooled=True, pool_size=3) as db:
+            self.assertEqual(db._pool.max_size, 3)
+
+    def test_pooled_sqlite_connection(self):
+        with get_sqlite_connection(self.db_path, pooled=True) as conn:
+            conn.execute("CREATE TABLE test (id INTEGER)")
+            conn.commit()
+        self.assertEqual(get_pool(self.db_path).stats()["idle"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,126 @@
+# libs/database_utils/tests/test_result_cache.py
+
+import os
+import sqlite3
+import time
+import unittest
+
+from database_utils.db_connector import DatabaseManager
+from database_utils.result_cache import MISS, ResultCache, statement_tables
+
+
+class TestResultCache(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "test_cache.db"
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def tearDown(self):
+        if os.path.exists(self.db_path):
+            os.remove(self.db_path)
+
+    def test_statement_tables(self):
+        conn = sqlite3.connect(":memory:")
+        conn.executescript(
+            """
+            CREATE TABLE tasks (id INTEGER, completed INTEGER);
+            CREATE TABLE a (id INTEGER, x TEXT);
+            CREATE TABLE "b" (id INTEGER);
+            CREATE TABLE log (task_id INTEGER);
+            CREATE TRIGGER tasks_log AFTER INSERT ON tasks BEGIN
+                INSERT INTO log VALUES (new.id);
+            END;
+            """
+        )
+        reads = lambda query, params=(): statement_tables(conn, query, params)[0]
+        writes = lambda query, params=(): statement_tables(conn, query, params)[1]
+        self.assertEqual(reads("SELECT * FROM tasks WHERE id = ?", (1,)), {"tasks"})
+        self.assertEqual(reads("SELECT a.x FROM a JOIN \"b\" ON a.id = b.id"), {"a", "b"})
+        self.assertEqual(reads("SELECT * FROM tasks, log WHERE id = task_id"), {"tasks", "log"})
+        self.assertIsNone(reads("SELECT name FROM sqlite_master"))
+        self.assertIsNone(reads("PRAGMA index_list(tasks)"))
+        self.assertEqual(writes("INSERT OR REPLACE INTO Tasks VALUES (?, ?)", (1, 0)), {"tasks", "log"})
+        self.assertEqual(writes("DELETE FROM tasks WHERE id = ?", (1,)), {"tasks"})
+        self.assertIsNone(writes("CREATE INDEX idx ON tasks (completed)"))
+        self.assertIsNone(statement_tables(conn, "SELECT * FROM missing"))
+
+    def test_lru_eviction_and_ttl(self):
+        cache = ResultCache(max_entries=2, ttl=0.05)
+        for key in ("a", "b", "c"):
+            cache.put(key, frozenset({"t"}), key.upper(), cache.snapshot({"t"}))
+        self.assertIs(cache.get("a"), MISS)
+        self.assertEqual(cache.get("c"), "C")
+        time.sleep(0.06)
+        self.assertIs(cache.get("c"), MISS)
+        stats = cache.stats()
+        self.assertEqual(stats["evictions"], 1)
+        self.assertEqual(stats["expirations"], 1)
+
+    def test_put_after_racing_write_is_dropped(self):
+        cache = ResultCache()
+        snapshot = cache.snapshot(frozenset({"t"}))
+        cache.invalidate("t")
+        cache.put("k", frozenset({"t"}), "stale", snapshot)
+        self.assertIs(cache.get("k"), MISS)
+
+    def test_on_invalidate_hears_every_invalidation(self):
+        seen = []
+        cache = ResultCache(on_invalidate=seen.append)
+        with DatabaseManager(self.db_path, cache=cache) as db:
+            db.create_table("users", "id INTEGER")
+            seen.clear()
+            db.execute_query("INSERT INTO users VALUES (?)", (1,))
+        cache.clear()
+        self.assertEqual(seen, ["users", None])
+
+    def test_read_through_and_invalidation(self):
+        cache = ResultCache()
+        with DatabaseManager(self.db_path, cache=cache) as db:
+            db.create_table("users", "id INTEGER, name TEXT")
+            db.execute_query("INSERT INTO users VALUES (?, ?)", (1, "before"))
+            query = "SELECT name FROM users WHERE id = ?"
+            self.assertEqual(db.fetchone(query, (1,))["name"], "before")
+            self.assertEqual(db.fetchone(query, (1,))["name"], "before")
+            self.assertEqual(cache.stats()["hits"], 1)
+
+            db.execute_query("UPDATE users SET name = ? WHERE id = ?", ("after", 1))
+            self.assertEqual(db.fetchone(query, (1,))["name"], "after")
+
+            self.assertEqual(len(db.fetchall("SELECT * FROM users")), 1)
+            with db.transaction():
+                db.bulk_insert("users", ("id", "name"), [(2, "b")])
+                self.assertEqual(len(db.fetchall("SELECT * FROM users")), 2)
+
+    def test_trigger_writes_invalidate_their_tables(self):
+        cache = ResultCache()
+        with DatabaseManager(self.db_path, cache=cache) as db:
+            db.create_table("events", "id INTEGER")
+            db.create_table("log", "event_id INTEGER")
+            db.execute_query(
+                "CREATE TRIGGER events_log AFTER INSERT ON events BEGIN "
+                "INSERT INTO log VALUES (new.id); END"
+            )
+            count = "SELECT COUNT(*) FROM log"
+            self.assertEqual(db.fetchone(count)[0], 0)
+            db.execute_query("INSERT INTO events VALUES (?)", (1,))
+            self.assertEqual(db.fetchone(count)[0], 1)
+            self.assertEqual(len(db.fetchall("SELECT * FROM users")), 2)
+
+    def test_trigger_writes_invalidate_their_tables(self):
+        cache = ResultCache()
+        with DatabaseManager(self.db_path, cache=cache) as db:
+            db.create_table("events", "id INTEGER")
+            db.create_table("log", "event_id INTEGER")
+            db.execute_query(
+                "CREATE TRIGGER events_log AFTER INSERT ON events BEGIN "
+                "INSERT INTO log VALUES (new.id); END"
+            )
+            count = "SELECT COUNT(*) FROM log"
+            self.assertEqual(db.fetchone(count)[0], 0)
+            db.execute_query("INSERT INTO events VALUES (?)", (1,))
+            self.assertEqual(db.fetchone(count)[0], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,109 @@
+# libs/database_utils/tests/test_writer.py
+
+import os
+import sqlite3
+import unittest
+from concurrent.futures import ThreadPoolExecutor
+
+from database_utils.db_connector import DatabaseManager
+from database_utils.pool import close_all_pools
+from database_utils.writer import SerializedWriter, WriteResult, close_all_writers, get_writer
+
+
+class TestSerializedWriter(unittest.TestCase):
+
+    def setUp(self):
+        self.db_path = "test_writer.db"
+        self._cleanup()
+
+    def tearDown(self):
+        close_all_pools()
+        close_all_writers()
+        self._cleanup()
+
+    def _cleanup(self):
+        for suffix in ("", "-wal", "-shm"):
+            if os.path.exists(self.db_path + suffix):
+                os.remove(self.db_path + suffix)
+
+    def test_concurrent_writes_are_group_committed(self):
+        writer = SerializedWriter(self.db_path)
+        writer.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT)")
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            futures = [
+                executor.submit(writer.execute, "INSERT INTO users (name) VALUES (?)", (f"u{i}",))
+                for i in range(200)
+            ]
+            results = [future.result() for future in futures]
+        writer.close()
+
+        self.assertTrue(all(isinstance(result, WriteResult) for result in results))
+        self.assertEqual(sorted(result.lastrowid for result in results), list(range(1, 201)))
+        stats = writer.stats()
+        self.assertEqual(stats["writes"], 201)
+        self.assertLessEqual(stats["commits"], stats["writes"])
+
+    def test_failed_write_does_not_fail_its_group(self):
+        writer = SerializedWriter(self.db_path)
+        writer.execute("CREATE TABLE users (id INTEGER PRIMARY KEY, name TEXT NOT NULL)")
+        good = writer.submit("INSERT INTO users (name) VALUES (?)", ("ok",))
+        bad = writer.submit("INSERT INTO users (name) VALUES (?)", (None,))
+        many = writer.submit_many("INSERT INTO users (name) VALUES (?)", [("a",), ("b",)])
+        self.assertEqual(good.result().rowcount, 1)
+        with self.assertRaises(sqlite3.IntegrityError):
+            bad.result()
+        self.assertEqual(many.result(), 2)
+        writer.close()
+
+        with sqlite3.connect(self.db_path) as conn:
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM users").fetchone()[0], 3)
+
+    def test_non_sqlite_error_fails_only_its_write(self):
+        writer = SerializedWriter(self.db_path)
+        writer.execute("CREATE TABLE t (value)")
+        overflow = writer.submit("INSERT INTO t VALUES (?)", (2**70,))
+        surrogate = writer.submit("INSERT INTO t VALUES (?)", ("\ud800",))
+        good = writer.submit("INSERT INTO t VALUES (?)", (1,))
+        with self.assertRaises(OverflowError):
+            overflow.result(timeout=5)
+        with self.assertRaises(UnicodeEncodeError):
+            surrogate.result(timeout=5)
+        self.assertEqual(good.result(timeout=5).rowcount, 1)
+
+        # The writer thread survives and the database is not left write-locked.
+        self.assertEqual(writer.submit("INSERT INTO t VALUES (2)").result(timeout=5).rowcount, 1)
+        with sqlite3.connect(self.db_path, timeout=1) as conn:
+            conn.execute("INSERT INTO t VALUES (3)")
+            self.assertEqual(conn.execute("SELECT COUNT(*) FROM t").fetchone()[0], 3)
+        writer.close()
+
+    def test_shared_writer_rejects_a_conflicting_configuration(self):
+        writer = get_writer(self.db_path, max_batch=8)
+        self.assertIs(get_writer(self.db_path), writer)
+        self.assertIs(get_writer(self.db_path, max_batch=8), writer)
+        with self.assertRaises(ValueError):
+            get_writer(self.db_path, max_batch=16)
+        with self.assertRaises(ValueError):
+            get_writer(self.db_path, max_batch=8, pragmas={"journal_mode": "DELETE"})
+
+    def test_single_writer_database_manager(self):
+        for pooled in (False, True):
+            with DatabaseManager(self.db_path, pooled=pooled, single_writer=True) as db:
+                db.create_table("users", "id INTEGER PRIMARY KEY, name TEXT")
+                result = db.execute_query("INSERT INTO users (name) VALUES (?)", ("user1",))
+                self.assertEqual(result.rowcount, 1)
+                self.assertEqual(
+                    db.fetchone("SELECT name FROM users WHERE id = ?", (result.lastrowid,))["name"],
+                    "user1",
+                )
+                with self.assertRaises(sqlite3.OperationalError):
+                    db.conn.execute("DELETE FROM users")
+
+                with db.transaction():
+                    cursor = db.execute_query("INSERT INTO users (name) VALUES (?)", ("user2",))
+                    self.assertIsNotNone(db.fetchone("SELECT * FROM users WHERE id = ?", (cursor.lastrowid,)))
+                self.assertEqual(db.executemany("DELETE FROM users WHERE name = ?", [("user1",), ("user2",)]), 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,95 @@
+# libs/image_processing/benchmarks/sepia.py
+
+"""
+Compares the colour-matrix sepia filter with the original per-pixel loop.
+
+The per-pixel loop runs at a roughly constant cost per pixel, so it is timed
+on a smaller image (--reference-megapixels) and both filters are reported in
+milliseconds per megapixel. Run from the monorepo root:
+
+    python libs/image_processing/benchmarks/sepia.py --megapixels 24
+"""
+
+import argparse
+import json
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from PIL import Image, ImageChops  # noqa: E402
+
+from image_processing.image_utils import SEPIA_MATRIX, apply_color_matrix  # noqa: E402
+
+ASPECT = (3, 2)
+
+
+def sepia_per_pixel(image: Image.Image) -> Image.Image:
+    """The original getpixel/putpixel implementation, kept as the baseline."""
+    image = image.copy()
+    width, height = image.size
+    for py in range(height):
+        for px in range(width):
+            r, g, b = image.getpixel((px, py))
+            tr = int(0.393 * r + 0.769 * g + 0.189 * b)
+            tg = int(0.349 * r + 0.686 * g + 0.168 * b)
+            tb = int(0.272 * r + 0.534 * g + 0.131 * b)
+            image.putpixel((px, py), (tr, tg, tb))
+    return image
+
+
+def photo(megapixels: float) -> Image.Image:
+    """A noisy RGB test image of about the given size, with a 3:2 aspect."""
+    unit = (megapixels * 1e6 / (ASPECT[0] * ASPECT[1])) ** 0.5
+    size = (int(unit * ASPECT[0]), int(unit * ASPECT[1]))
+    return Image.merge(
+        "RGB", [Image.effect_noise(size, 64).point(lambda v, o=o: v + o) for o in (0, 20, -20)]
+    )
+
+
+def best_time(fn, image, repeat) -> float:
+    times = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(image)
+        times.append(time.perf_counter() - started)
+    return min(times)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the sepia filter.")
+    parser.add_argument("--megapixels", type=float, default=24.0, help="Size for the fast filter.")
+    parser.add_argument(
+        "--reference-megapixels", type=float, default=0.5, help="Size for the per-pixel loop."
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs for the fast filter.")
+    args = parser.parse_args()
+
+    small = photo(args.reference_megapixels)
+    reference = sepia_per_pixel(small)
+    matrix = apply_color_matrix(small, SEPIA_MATRIX)
+    # The matrix rounds where the loop truncated, so channels may differ by one.
+    difference = ImageChops.difference(reference, matrix).getextrema()
+    max_difference = max(high for _, high in difference)
+
+    per_pixel_ms = best_time(sepia_per_pixel, small, 1) * 1000 / args.reference_megapixels
+    large = photo(args.megapixels)
+    matrix_ms = best_time(
+        lambda image: apply_color_matrix(image, SEPIA_MATRIX), large, args.repeat
+    ) * 1000 / args.megapixels
+
+    print(json.dumps({
+        "megapixels": args.megapixels,
+        "reference_megapixels": args.reference_megapixels,
+        "ms_per_megapixel": {
+            "per_pixel": round(per_pixel_ms, 2),
+            "color_matrix": round(matrix_ms, 2),
+        },
+        "speedup": round(per_pixel_ms / matrix_ms, 1),
+        "max_channel_difference": max_difference,
+    }, indent=2))
+
+
+if __name__ == "__main__":
+    main()
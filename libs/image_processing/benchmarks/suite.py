@@ -0,0 +1,212 @@
+# libs/image_processing/benchmarks/suite.py
+
+"""
+Times ImageProcessor operations across image sizes and modes.
+
+Synthetic images are generated for every size and mode. Each operation (and
+the lazy end-to-end pipeline) is then timed in a fresh worker process, so the
+peak RSS recorded for a case belongs to that case alone. The JSON report can
+be stored as a baseline and later runs compared against it; cases slower or
+hungrier than the baseline by more than --threshold are flagged and the
+script exits with status 1. Run from the monorepo root:
+
+    python libs/image_processing/benchmarks/suite.py --output baseline.json
+    python libs/image_processing/benchmarks/suite.py --baseline baseline.json
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import platform
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import PIL
+from PIL import Image, ImageFilter
+from rich.console import Console
+from rich.table import Table
+
+LIB_ROOT = Path(__file__).resolve().parents[1]
+sys.path.insert(0, str(LIB_ROOT / "src"))
+
+from image_processing import image_utils  # noqa: E402
+from image_processing.image_utils import ImageProcessor  # noqa: E402
+
+console = Console(stderr=True)
+
+DEFAULT_SIZES = "640x480,1920x1080,4000x3000"
+DEFAULT_MODES = "RGB,RGBA,L,P"
+OPERATIONS = ("resize", "grayscale", "sepia", "watermark", "save", "pipeline")
+# JPEG for photo-like modes, PNG for anything with alpha or a palette.
+FORMATS = {"RGB": "JPEG", "L": "JPEG", "RGBA": "PNG", "P": "PNG"}
+TARGET_SIZE = (1280, 720)
+
+
+def parse_sizes(text: str) -> list:
+    return [tuple(int(part) for part in size.split("x")) for size in text.split(",")]
+
+
+def synthetic_image(size, mode: str) -> Image.Image:
+    """A smooth, photo-like image with some fine detail, in the given mode."""
+    small = (max(1, size[0] // 8), max(1, size[1] // 8))
+    bands = [
+        Image.effect_noise(small, 60).filter(ImageFilter.GaussianBlur(4)).resize(size)
+        for _ in range(3)
+    ]
+    image = Image.merge("RGB", bands)
+    if mode == "RGBA":
+        image.putalpha(Image.linear_gradient("L").resize(size))
+    elif mode == "P":
+        image = image.quantize(256)
+    elif mode != "RGB":
+        image = image.convert(mode)
+    return image
+
+
+def _run(operation: str, path: str, output_path: str):
+    if operation == "pipeline":
+        processor = ImageProcessor(path, lazy=True)
+        processor.resize(TARGET_SIZE).apply_grayscale().apply_sepia().add_watermark("Sample")
+        processor.save(output_path)
+        return
+    processor = ImageProcessor(path)
+    processor.image.load()
+    started = time.perf_counter()
+    if operation == "resize":
+        processor.resize(TARGET_SIZE)
+    elif operation == "grayscale":
+        processor.apply_grayscale()
+    elif operation == "sepia":
+        processor.apply_sepia()
+    elif operation == "watermark":
+        processor.add_watermark("Sample")
+    else:
+        processor.save(output_path)
+    return time.perf_counter() - started
+
+
+def run_case(operation: str, path: str, repeat: int) -> dict:
+    """Times one operation on one image; runs in its own worker process."""
+    image_utils.console.quiet = True
+    output_path = os.path.join(
+        os.path.dirname(path), f"out-{os.getpid()}{os.path.splitext(path)[1]}"
+    )
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        elapsed = _run(operation, path, output_path)
+        timings.append(time.perf_counter() - started if elapsed is None else elapsed)
+    return {
+        "seconds": statistics.median(timings),
+        "min_seconds": min(timings),
+        # ru_maxrss is in KiB on Linux.
+        "peak_rss_mb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            cwd=LIB_ROOT, capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def run_suite(args) -> dict:
+    results = {}
+    context = multiprocessing.get_context("spawn")
+    with tempfile.TemporaryDirectory(prefix="image-bench-") as workdir:
+        for width, height in parse_sizes(args.sizes):
+            for mode in args.modes.split(","):
+                extension = FORMATS[mode].lower()
+                path = os.path.join(workdir, f"{mode}-{width}x{height}.{extension}")
+                synthetic_image((width, height), mode).save(path, FORMATS[mode])
+                for operation in args.operations.split(","):
+                    key = f"{operation} {mode} {width}x{height}"
+                    with context.Pool(1, maxtasksperchild=1) as pool:
+                        results[key] = pool.apply(run_case, (operation, path, args.repeat))
+                    console.log(f"{key}: {results[key]['seconds'] * 1000:.1f} ms")
+                os.remove(path)
+    return {
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pillow": PIL.__version__,
+        "machine": platform.machine(),
+        "repeat": args.repeat,
+        "results": results,
+    }
+
+
+def compare(report: dict, baseline: dict, threshold: float) -> list:
+    """Returns (case, metric, baseline, current, ratio) for every regression."""
+    regressions = []
+    for key, current in report["results"].items():
+        previous = baseline.get("results", {}).get(key)
+        if previous is None:
+            continue
+        for metric in ("seconds", "peak_rss_mb"):
+            ratio = current[metric] / previous[metric] if previous[metric] else 1.0
+            if ratio > 1 + threshold:
+                regressions.append((key, metric, previous[metric], current[metric], ratio))
+    return regressions
+
+
+def print_regressions(regressions: list, threshold: float):
+    if not regressions:
+        console.print(f"[bold green]No regressions beyond {threshold:.0%}.[/bold green]")
+        return
+    table = Table(title=f"Regressions beyond {threshold:.0%}")
+    for column in ("Case", "Metric", "Baseline", "Current", "Change"):
+        table.add_column(column)
+    for key, metric, previous, current, ratio in regressions:
+        table.add_row(
+            key, metric, f"{previous:.4g}", f"{current:.4g}", f"[red]+{ratio - 1:.0%}[/red]"
+        )
+    console.print(table)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark ImageProcessor operations.")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="Comma-separated WxH sizes.")
+    parser.add_argument("--modes", default=DEFAULT_MODES, help="Comma-separated image modes.")
+    parser.add_argument(
+        "--operations", default=",".join(OPERATIONS), help="Comma-separated operations."
+    )
+    parser.add_argument("--repeat", type=int, default=3, help="Timing runs per case.")
+    parser.add_argument("--output", help="Write the JSON report here as well as stdout.")
+    parser.add_argument("--baseline", help="A previous report to compare against.")
+    parser.add_argument(
+        "--threshold", type=float, default=0.2, help="Allowed slowdown, e.g. 0.2 for 20%%."
+    )
+    args = parser.parse_args()
+
+    for mode in args.modes.split(","):
+        if mode not in FORMATS:
+            parser.error(f"unsupported mode {mode!r}; choose from {', '.join(FORMATS)}")
+    for operation in args.operations.split(","):
+        if operation not in OPERATIONS:
+            parser.error(f"unknown operation {operation!r}")
+
+    report = run_suite(args)
+    text = json.dumps(report, indent=2)
+    print(text)
+    if args.output:
+        Path(args.output).write_text(text + "\n")
+    if args.baseline:
+        baseline = json.loads(Path(args.baseline).read_text())
+        regressions = compare(report, baseline, args.threshold)
+        print_regressions(regressions, args.threshold)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
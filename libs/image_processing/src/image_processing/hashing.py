@@ -0,0 +1,172 @@
+# libs/image_processing/src/image_processing/hashing.py
+
+import math
+from functools import lru_cache
+from itertools import combinations
+
+from PIL import Image
+
+DEFAULT_HASH_SIZE = 8
+PHASH_FACTOR = 4
+HASH_METHODS = ("ahash", "dhash", "phash")
+
+
+def hamming_distance(a: int, b: int) -> int:
+    """Counts the bits that differ between two hashes."""
+    return (a ^ b).bit_count()
+
+
+def _bits(values) -> int:
+    result = 0
+    for bit in values:
+        result = (result << 1) | bit
+    return result
+
+
+def _gray_thumbnail(image: Image.Image, size) -> list:
+    """Shrinks image to size in greyscale and returns its pixels row by row."""
+    small = image.convert("L").resize(size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    return list(small.tobytes())
+
+
+def average_hash(image: Image.Image, hash_size: int = DEFAULT_HASH_SIZE) -> int:
+    """aHash: one bit per pixel of a tiny greyscale copy, set where it is above the mean."""
+    pixels = _gray_thumbnail(image, (hash_size, hash_size))
+    mean = sum(pixels) / len(pixels)
+    return _bits(pixel > mean for pixel in pixels)
+
+
+def difference_hash(image: Image.Image, hash_size: int = DEFAULT_HASH_SIZE) -> int:
+    """dHash: one bit per horizontally adjacent pixel pair, set where brightness rises."""
+    width = hash_size + 1
+    pixels = _gray_thumbnail(image, (width, hash_size))
+    return _bits(
+        pixels[row + column] < pixels[row + column + 1]
+        for row in range(0, len(pixels), width)
+        for column in range(hash_size)
+    )
+
+
+@lru_cache(maxsize=8)
+def _dct_table(size: int, frequencies: int) -> tuple:
+    return tuple(
+        tuple(math.cos(math.pi * (2 * x + 1) * u / (2 * size)) for x in range(size))
+        for u in range(frequencies)
+    )
+
+
+def perceptual_hash(image: Image.Image, hash_size: int = DEFAULT_HASH_SIZE) -> int:
+    """
+    pHash: bits of the lowest hash_size x hash_size DCT frequencies of a small
+    greyscale copy, set where a coefficient is above their median.
+
+    Only those frequencies are computed, so no full DCT (or NumPy) is needed.
+    """
+    size = hash_size * PHASH_FACTOR
+    pixels = _gray_thumbnail(image, (size, size))
+    table = _dct_table(size, hash_size)
+    rows = [
+        [sum(c * p for c, p in zip(basis, pixels[y * size:(y + 1) * size])) for basis in table]
+        for y in range(size)
+    ]
+    coefficients = [
+        sum(c * rows[y][u] for y, c in enumerate(basis))
+        for basis in table
+        for u in range(hash_size)
+    ]
+    median = sorted(coefficients)[len(coefficients) // 2]
+    return _bits(value > median for value in coefficients)
+
+
+_HASHERS = {"ahash": average_hash, "dhash": difference_hash, "phash": perceptual_hash}
+
+
+def hash_image(image: Image.Image, method: str = "phash", hash_size: int = DEFAULT_HASH_SIZE):
+    """Computes the named perceptual hash ("ahash", "dhash" or "phash") of an image."""
+    if method not in _HASHERS:
+        raise ValueError(f"method must be one of {HASH_METHODS}")
+    return _HASHERS[method](image, hash_size)
+
+
+def hash_file(path: str, method: str = "phash", hash_size: int = DEFAULT_HASH_SIZE) -> int:
+    """
+    Hashes an image file from a small decoded thumbnail.
+
+    JPEGs are decoded straight to luma at the smallest DCT scale that still
+    covers the hash input, so hashing costs a fraction of a full decode.
+    """
+    side = hash_size * (PHASH_FACTOR if method == "phash" else 1) + 1
+    with Image.open(path) as image:
+        image.draft("L", (side * 2, side * 2))
+        return hash_image(image, method, hash_size)
+
+
+class HashIndex:
+    """
+    A multi-index hash table for Hamming-distance lookups over fixed-width hashes.
+
+    Every hash is split into `chunks` equal bit ranges, each with its own table.
+    Two hashes within distance r must agree to within r // chunks bits on at
+    least one chunk (pigeonhole), so a lookup only probes chunk values that
+    close to the query's and verifies those candidates. Unlike a tree, this
+    stays fast when, as with perceptual hashes, most distances bunch up around
+    half the bit width.
+    """
+
+    def __init__(self, bits: int = DEFAULT_HASH_SIZE ** 2, chunks: int = 4):
+        if bits % chunks:
+            raise ValueError("bits must be a multiple of chunks")
+        self.bits = bits
+        self.chunks = chunks
+        self._width = bits // chunks
+        self._mask = (1 << self._width) - 1
+        self._tables = [{} for _ in range(chunks)]
+        self._entries = []
+
+    def __len__(self):
+        return len(self._entries)
+
+    def _chunk_values(self, hash_value: int):
+        return [
+            (hash_value >> (index * self._width)) & self._mask for index in range(self.chunks)
+        ]
+
+    def add(self, hash_value: int, item=None):
+        """Adds an item under hash_value."""
+        position = len(self._entries)
+        self._entries.append((hash_value, item))
+        for table, value in zip(self._tables, self._chunk_values(hash_value)):
+            table.setdefault(value, []).append(position)
+
+    def find(self, hash_value: int, max_distance: int) -> list:
+        """Returns (distance, hash, item) for every item within max_distance, nearest first."""
+        flips = _flip_masks(self._width, max_distance // self.chunks)
+        seen = set()
+        matches = []
+        for table, value in zip(self._tables, self._chunk_values(hash_value)):
+            for flip in flips:
+                for position in table.get(value ^ flip, ()):
+                    if position in seen:
+                        continue
+                    seen.add(position)
+                    candidate, item = self._entries[position]
+                    distance = hamming_distance(hash_value, candidate)
+                    if distance <= max_distance:
+                        matches.append((distance, candidate, item))
+        matches.sort(key=lambda match: match[0])
+        return matches
+
+    def nearest(self, hash_value: int, max_distance: int):
+        """Returns the closest (distance, hash, item) within max_distance, or None."""
+        matches = self.find(hash_value, max_distance)
+        return matches[0] if matches else None
+
+
+@lru_cache(maxsize=32)
+def _flip_masks(width: int, radius: int) -> tuple:
+    """Every width-bit mask with at most radius bits set."""
+    return tuple(
+        sum(1 << bit for bit in bits)
+        for count in range(radius + 1)
+        for bits in combinations(range(width), count)
+    )
@@ -1,17 +1,238 @@
 # libs/image_processing/src/image_processing/image_utils.py
 
+from functools import lru_cache
 from typing import Tuple
 
 from PIL import Image, ImageDraw, ImageFont
 from rich.console import Console
 
+from .tiled import MemoryLimitError, filter_bytes, image_bytes, map_strips
+
 console = Console()
 
+# Rows give the output R, G and B as weights of the input R, G and B (plus offset).
+SEPIA_MATRIX = (
+    0.393, 0.769, 0.189, 0,
+    0.349, 0.686, 0.168, 0,
+    0.272, 0.534, 0.131, 0,
+)
+
+
+# Pillow's own RGB to L weights (ITU-R 601-2 luma), written as an RGB matrix.
+GRAYSCALE_MATRIX = (0.299, 0.587, 0.114, 0) * 3
+COLOR_MATRICES = {"grayscale": GRAYSCALE_MATRIX, "sepia": SEPIA_MATRIX}
+WATERMARK_MARGIN = 10
+# thumbnail() may decode JPEGs at down to this multiple of the target size.
+DEFAULT_REDUCING_GAP = 2.0
+
+
+def apply_color_matrix(image: Image.Image, matrix) -> Image.Image:
+    """
+    Applies a 12-value RGB colour matrix to a whole image in one pass.
+
+    Results are rounded and clamped to 0-255. Greyscale and palette images are
+    expanded to RGB first, and an alpha channel, if any, is kept unchanged.
+    """
+    if image.mode in ("RGBA", "LA", "PA") or (
+        image.mode == "P" and "transparency" in image.info
+    ):
+        image = image.convert("RGBA")
+        alpha = image.getchannel("A")
+        result = image.convert("RGB").convert("RGB", matrix)
+        result.putalpha(alpha)
+        return result
+    if image.mode != "RGB":
+        image = image.convert("RGB")
+    return image.convert("RGB", matrix)
+
+
+def compose_color_matrices(outer, inner):
+    """Returns the single matrix that applies inner, then outer."""
+    composed = []
+    for row in range(3):
+        weights = outer[row * 4:row * 4 + 4]
+        for column in range(4):
+            composed.append(sum(weights[k] * inner[k * 4 + column] for k in range(3)))
+        composed[-1] += weights[3]
+    return tuple(composed)
+
+
+def _cannot_overflow(matrix) -> bool:
+    """True if the matrix maps 0-255 inputs into 0-255, so skipping its clamp is exact."""
+    return all(
+        min(matrix[row * 4:row * 4 + 4]) >= 0 and sum(matrix[row * 4:row * 4 + 4]) <= 1
+        for row in range(3)
+    )
+
+
+def apply_color_filters(image: Image.Image, names) -> Image.Image:
+    """
+    Applies consecutive "grayscale" / "sepia" filters with as few passes as possible.
+
+    Filters are folded into one matrix as long as the result so far cannot leave
+    0-255, so the answer matches running them one by one (within rounding).
+    Grayscale drops alpha and, as the last filter, yields an L image.
+    """
+    if all(name == "grayscale" for name in names):
+        return image.convert("L")
+    passes = []
+    for name in names:
+        if passes and _cannot_overflow(passes[-1][1]):
+            group, matrix = passes[-1]
+            passes[-1] = (group + [name], compose_color_matrices(COLOR_MATRICES[name], matrix))
+        else:
+            passes.append(([name], COLOR_MATRICES[name]))
+    for group, matrix in passes:
+        if "grayscale" in group and image.mode != "RGB":
+            image = image.convert("RGB")
+        if group[-1] == "grayscale":
+            image = image.convert("L", matrix[:4])
+        else:
+            image = apply_color_matrix(image, matrix)
+    return image
+
+
+@lru_cache(maxsize=16)
+def load_font(font_path: str | None, font_size: int):
+    """Loads a TrueType font once per process, falling back to Pillow's default."""
+    if font_path:
+        try:
+            return ImageFont.truetype(font_path, font_size)
+        except IOError:
+            console.log(
+                f"[yellow]Warning: Font not found at {font_path}. Using default font.[/yellow]"
+            )
+    return ImageFont.load_default()
+
+
+@lru_cache(maxsize=64)
+def watermark_mask(text: str, font_path: str | None, font_size: int, opacity: int):
+    """
+    Renders watermark text once per process as an L mask: antialiased glyph
+    coverage scaled by opacity, keeping the text's offset from its origin.
+    """
+    font = load_font(font_path, font_size)
+    width, height = font.getbbox(text)[2:]
+    mask = Image.new("L", (max(width, 1), max(height, 1)))
+    ImageDraw.Draw(mask).text((0, 0), text, font=font, fill=opacity)
+    return mask
+
+
+@lru_cache(maxsize=64)
+def watermark_overlay(text: str, font_path: str | None, font_size: int, opacity: int):
+    """Returns the cached mask as white RGBA, for compositing onto images with alpha."""
+    mask = watermark_mask(text, font_path, font_size, opacity)
+    overlay = Image.new("RGBA", mask.size, (255, 255, 255, 0))
+    overlay.putalpha(mask)
+    return overlay
+
+
+def composite_watermark(
+    image: Image.Image, text: str, font_path: str | None = None, font_size: int = 36,
+    opacity: int = 128,
+) -> Image.Image:
+    """
+    Blends white watermark text into the bottom-right corner of image and returns it.
+
+    RGB and L images are blended in place with one masked paste; images with
+    alpha get true alpha compositing. Other modes are converted to RGB(A) first.
+    """
+    if image.mode not in ("RGB", "RGBA", "L"):
+        has_alpha = "A" in image.getbands() or "transparency" in image.info
+        image = image.convert("RGBA" if has_alpha else "RGB")
+    mask = watermark_mask(text, font_path, font_size, opacity)
+    x = image.width - mask.width - WATERMARK_MARGIN
+    y = image.height - mask.height - WATERMARK_MARGIN
+    if image.mode == "RGBA":
+        image.alpha_composite(
+            watermark_overlay(text, font_path, font_size, opacity),
+            dest=(max(x, 0), max(y, 0)),
+            source=(max(-x, 0), max(-y, 0)),
+        )
+    else:
+        image.paste(255 if image.mode == "L" else (255, 255, 255), (x, y), mask)
+    return image
+
+
+def plan_operations(operations):
+    """
+    Reorders and fuses queued (kind, *args) operations for the least pixel work.
+
+    Between watermarks, which stay where they were, every downscale is merged
+    into one and moved ahead of the colour filters, and the filters are grouped
+    into a single step. Watermarks are not moved across anything, since their
+    size and colour depend on what ran before them. A merged downscale keeps the
+    largest reducing_gap, where None (always decode at full size) is largest.
+    """
+    plan = []
+    size, gap, filters = None, None, []
+    for operation in operations + [None]:
+        if operation is not None and operation[0] == "resize":
+            _, new, new_gap = operation
+            if size is None:
+                size, gap = new, new_gap
+            else:
+                size = (min(size[0], new[0]), min(size[1], new[1]))
+                gap = None if gap is None or new_gap is None else max(gap, new_gap)
+        elif operation is not None and operation[0] == "filter":
+            filters.append(operation[1])
+        else:
+            if size is not None:
+                plan.append(("resize", size, gap))
+            if filters:
+                plan.append(("filter", tuple(filters)))
+            size, filters = None, []
+            if operation is not None:
+                plan.append(operation)
+    return plan
+
+
+def draft_request(plan):
+    """
+    Returns the (mode, size) to request from the decoder before a plan runs.
+
+    When the plan starts with a downscale, the image only needs decoding at
+    reducing_gap times the target size (JPEG DCT scaling by 1/2, 1/4 or 1/8).
+    When the first colour filters start with grayscale, only luma is needed,
+    so the mode is "L". Returns None if neither applies.
+    """
+    mode = size = None
+    steps = iter(plan)
+    step = next(steps, None)
+    if step is not None and step[0] == "resize":
+        _, max_size, reducing_gap = step
+        if reducing_gap is not None:
+            size = (int(max_size[0] * reducing_gap), int(max_size[1] * reducing_gap))
+        step = next(steps, None)
+    if step is not None and step[0] == "filter" and step[1][0] == "grayscale":
+        mode = "L"
+    if mode is None and size is None:
+        return None
+    return mode, size
+
 
 class ImageProcessor:
-    """A class for performing various image processing operations."""
+    """
+    A class for performing various image processing operations.
 
-    def __init__(self, image_path: str):
+    With lazy=True, resize, apply_grayscale, apply_sepia and add_watermark only
+    record what to do, and the chain runs the first time the image is needed
+    (save, convert_format or reading the image attribute), in the order given
+    by plan_operations: downscale first, then each run of colour filters as one
+    pass. Setting image discards any operations still queued.
+
+    With memory_limit (bytes), colour filters run strip by strip, pasting back
+    into the image instead of allocating a second full-size copy, and an image
+    whose decoded size alone exceeds the limit raises MemoryLimitError before it
+    is decoded. peak_memory holds the estimated peak bytes of pixel buffers
+    used for this image, whether or not a limit is set.
+    """
+
+    def __init__(self, image_path: str, lazy: bool = False, memory_limit: int | None = None):
+        self.lazy = lazy
+        self.memory_limit = memory_limit
+        self.peak_memory = None
+        self._pending = []
         try:
             self.image = Image.open(image_path)
             self.image_path = image_path
@@ -23,20 +244,110 @@ class ImageProcessor:
             console.log(f"[bold red]Error opening image {image_path}: {e}[/bold red]")
             raise
 
+    @property
+    def image(self) -> Image.Image:
+        if self._pending or self.peak_memory is None:
+            self._run_pending()
+        return self._image
+
+    @image.setter
+    def image(self, value: Image.Image):
+        self._pending = []
+        self._image = value
+
+    def _queue(self, *operation):
+        self._pending.append(operation)
+        if not self.lazy:
+            self._run_pending()
+        return self
+
+    def _run_pending(self):
+        operations, self._pending = self._pending, []
+        plan = plan_operations(operations)
+        request = draft_request(plan)
+        # Only has an effect on JPEGs that have not been decoded yet.
+        if request is not None and self._image.draft(*request) is not None:
+            console.log(
+                f"Decoding at reduced size {self._image.size} ({self._image.mode})."
+            )
+        if self.peak_memory is None:
+            self._track(image_bytes(self._image.mode, self._image.size))
+        for index, (kind, *args) in enumerate(plan):
+            if kind == "resize":
+                filtered_next = index + 1 < len(plan) and plan[index + 1][0] == "filter"
+                if filtered_next and self._image.mode in ("1", "P"):
+                    # Palette images resize with NEAREST; filters expand them anyway.
+                    self._image = self._image.convert(
+                        "RGBA" if "transparency" in self._image.info else "RGB"
+                    )
+                self._resize(*args)
+            elif kind == "filter":
+                self._image = self._apply_filters(args[0])
+                console.log(f"Applied {' + '.join(args[0])} filter.")
+            else:
+                self._draw_watermark(*args)
+
+    def _track(self, nbytes: int):
+        """Records a step's estimated buffer use, refusing it if over the limit."""
+        if self.memory_limit is not None and nbytes > self.memory_limit:
+            console.log(
+                f"[bold red]Error: {self.image_path} needs about {nbytes} bytes, "
+                f"over the {self.memory_limit} byte limit[/bold red]"
+            )
+            raise MemoryLimitError(
+                f"{self.image_path} needs about {nbytes} bytes; the limit is {self.memory_limit}."
+            )
+        self.peak_memory = max(self.peak_memory or 0, nbytes)
+
+    def _resize(self, max_size, reducing_gap):
+        image = self._image
+        scale = min(1, max_size[0] / image.width, max_size[1] / image.height)
+        target = (round(image.width * scale), round(image.height * scale))
+        self._track(image_bytes(image.mode, image.size) + image_bytes(image.mode, target))
+        image.thumbnail(max_size, Image.Resampling.LANCZOS, reducing_gap=reducing_gap)
+        console.log(f"Image resized to fit within {max_size}.")
+
+    def _apply_filters(self, names) -> Image.Image:
+        image = self._image
+        if self.memory_limit is None:
+            result = apply_color_filters(image, names)
+            self._track(
+                image_bytes(image.mode, image.size)
+                + image_bytes(result.mode, result.size)
+                + filter_bytes(image.mode, image.size)
+            )
+            return result
+        out_mode = apply_color_filters(image.crop((0, 0, 1, 1)), names).mode
+        result, plan = map_strips(
+            image, lambda strip: apply_color_filters(strip, names), out_mode, self.memory_limit
+        )
+        self._track(plan.peak_bytes)
+        console.log(f"Filtered in {plan.strips} strips of {plan.strip_height} rows.")
+        return result
+
     def save(self, output_path: str, quality: int = 85):
         """Saves the processed image to the specified path."""
         try:
             self.image.save(output_path, optimize=True, quality=quality)
             console.log(f"[green]Image saved to:[/green] [cyan]{output_path}[/cyan]")
+            console.log(f"Estimated peak memory: {self.peak_memory / 2**20:.1f} MiB")
         except Exception as e:
             console.log(f"[bold red]Error saving image to {output_path}: {e}[/bold red]")
             raise
 
-    def resize(self, max_size: Tuple[int, int] = (1280, 720)):
-        """Resizes the image to fit within max_size while maintaining aspect ratio."""
-        self.image.thumbnail(max_size, Image.Resampling.LANCZOS)
-        console.log(f"Image resized to fit within {max_size}.")
-        return self
+    def resize(
+        self,
+        max_size: Tuple[int, int] = (1280, 720),
+        reducing_gap: float | None = DEFAULT_REDUCING_GAP,
+    ):
+        """
+        Resizes the image to fit within max_size while maintaining aspect ratio.
+
+        A JPEG that has not been decoded yet is decoded straight at a reduced
+        scale no smaller than reducing_gap times max_size, then resampled.
+        Smaller gaps are faster, and None always decodes at full size.
+        """
+        return self._queue("resize", tuple(max_size), reducing_gap)
 
     def convert_format(self, output_path: str, format: str):
         """Converts the image to a different format."""
@@ -49,45 +360,18 @@ class ImageProcessor:
 
     def apply_grayscale(self):
         """Converts the image to grayscale."""
-        self.image = self.image.convert("L")
-        console.log("Applied grayscale filter.")
-        return self
+        return self._queue("filter", "grayscale")
 
     def apply_sepia(self):
         """Applies a sepia filter to the image."""
-        width, height = self.image.size
-        pixels = self.image.load()
-
-        for py in range(height):
-            for px in range(width):
-                r, g, b = self.image.getpixel((px, py))
-                tr = int(0.393 * r + 0.769 * g + 0.189 * b)
-                tg = int(0.349 * r + 0.686 * g + 0.168 * b)
-                tb = int(0.272 * r + 0.534 * g + 0.131 * b)
-                self.image.putpixel((px, py), (tr, tg, tb))
-        console.log("Applied sepia filter.")
-        return self
+        return self._queue("filter", "sepia")
 
     def add_watermark(
         self, text: str, font_path: str = None, font_size: int = 36, opacity: int = 128
     ):
         """Adds a text watermark to the image."""
-        draw = ImageDraw.Draw(self.image)
-        if font_path:
-            try:
-                font = ImageFont.truetype(font_path, font_size)
-            except IOError:
-                console.log(
-                    f"[yellow]Warning: Font not found at {font_path}. Using default font.[/yellow]"
-                )
-                font = ImageFont.load_default()
-        else:
-            font = ImageFont.load_default()
-
-        text_width, text_height = draw.textbbox((0, 0), text, font=font)[2:]
-        x = self.image.width - text_width - 10
-        y = self.image.height - text_height - 10
+        return self._queue("watermark", text, font_path, font_size, opacity)
 
-        draw.text((x, y), text, font=font, fill=(255, 255, 255, opacity))
+    def _draw_watermark(self, text, font_path, font_size, opacity):
+        self._image = composite_watermark(self._image, text, font_path, font_size, opacity)
         console.log(f"Added watermark: '{text}'")
-        return self
@@ -0,0 +1,69 @@
+# libs/image_processing/src/image_processing/tiled.py
+
+from collections import namedtuple
+
+from PIL import Image
+
+DEFAULT_MEMORY_LIMIT = 512 * 1024 * 1024
+# Pillow stores these modes with one or two bytes per pixel and every other mode
+# with four (RGB is padded to RGBX).
+_PIXEL_SIZES = {"1": 1, "L": 1, "P": 1, "I;16": 2, "I;16L": 2, "I;16B": 2, "I;16N": 2}
+# Scratch a filter needs per strip pixel: the cropped input, up to three
+# intermediate conversions and the result, at four bytes each.
+FILTER_SCRATCH_BYTES = 5 * 4
+
+StripPlan = namedtuple("StripPlan", ["strip_height", "strips", "peak_bytes"])
+
+
+class MemoryLimitError(MemoryError):
+    """Raised when an image cannot be processed within the memory limit."""
+
+
+def image_bytes(mode: str, size) -> int:
+    """Returns how many bytes Pillow needs to hold an image of this mode and size."""
+    return _PIXEL_SIZES.get(mode, 4) * size[0] * size[1]
+
+
+def filter_bytes(mode: str, size) -> int:
+    """
+    Estimates the scratch a whole-image colour filter allocates besides its
+    input and result: anything but plain RGB takes two extra RGB conversions.
+    """
+    return 0 if mode == "RGB" else 2 * image_bytes("RGB", size)
+
+
+def plan_strips(size, fixed_bytes: int, memory_limit: int) -> StripPlan:
+    """
+    Picks the tallest strip whose filter scratch, added to fixed_bytes (the
+    buffers that must live throughout), stays within memory_limit.
+    """
+    width, height = size
+    row_bytes = FILTER_SCRATCH_BYTES * width
+    rows = min(height, (memory_limit - fixed_bytes) // row_bytes)
+    if rows < 1:
+        raise MemoryLimitError(
+            f"Processing a {width}x{height} image needs at least "
+            f"{fixed_bytes + row_bytes} bytes; the limit is {memory_limit}."
+        )
+    return StripPlan(rows, -(-height // rows), fixed_bytes + rows * row_bytes)
+
+
+def map_strips(image: Image.Image, fn, out_mode: str, memory_limit: int):
+    """
+    Applies a pixel-wise fn to image one full-width strip at a time.
+
+    fn takes and returns a strip image, and must return out_mode. When that is
+    the image's own mode, results are pasted back into image itself, so no
+    second full-size buffer is needed. Otherwise they fill one new out_mode
+    image. Returns the result and the StripPlan used.
+    """
+    in_place = out_mode == image.mode
+    fixed = image_bytes(image.mode, image.size)
+    if not in_place:
+        fixed += image_bytes(out_mode, image.size)
+    plan = plan_strips(image.size, fixed, memory_limit)
+    output = image if in_place else Image.new(out_mode, image.size)
+    for top in range(0, image.height, plan.strip_height):
+        box = (0, top, image.width, min(image.height, top + plan.strip_height))
+        output.paste(fn(image.crop(box)), box)
+    return output, plan
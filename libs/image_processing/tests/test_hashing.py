@@ -0,0 +1,58 @@
+# libs/image_processing/tests/test_hashing.py
+
+import os
+import random
+import unittest
+
+from PIL import Image, ImageFilter
+from image_processing.hashing import (
+    HASH_METHODS,
+    HashIndex,
+    hamming_distance,
+    hash_file,
+    hash_image,
+)
+
+
+class TestHashing(unittest.TestCase):
+
+    def setUp(self):
+        noise = [Image.effect_noise((320, 240), 80).filter(ImageFilter.GaussianBlur(16))
+                 for _ in range(3)]
+        self.image = Image.merge("RGB", noise)
+        self.image_path = "test_hashing.jpg"
+
+    def tearDown(self):
+        if os.path.exists(self.image_path):
+            os.remove(self.image_path)
+
+    def test_near_duplicates_hash_close_and_others_far(self):
+        resized = self.image.resize((160, 120)).filter(ImageFilter.GaussianBlur(1))
+        mirrored = self.image.transpose(Image.Transpose.FLIP_LEFT_RIGHT)
+        for method in HASH_METHODS:
+            original = hash_image(self.image, method)
+            self.assertLess(original.bit_length(), 65)
+            self.assertLessEqual(hamming_distance(original, hash_image(resized, method)), 10)
+            self.assertGreater(hamming_distance(original, hash_image(mirrored, method)), 16)
+
+    def test_hash_file_matches_in_memory_hash(self):
+        self.image.save(self.image_path, quality=95)
+        distance = hamming_distance(hash_file(self.image_path), hash_image(self.image))
+        self.assertLessEqual(distance, 4)
+
+    def test_hash_index_matches_brute_force(self):
+        rng = random.Random(7)
+        hashes = [rng.getrandbits(64) for _ in range(2000)]
+        index = HashIndex()
+        for position, hash_value in enumerate(hashes):
+            index.add(hash_value, position)
+        query = hashes[42] ^ 0b1010_0001_0000_0001 ^ (1 << 60)
+        expected = sorted(p for p, h in enumerate(hashes) if hamming_distance(h, query) <= 8)
+        self.assertEqual(sorted(match[2] for match in index.find(query, 8)), expected)
+        self.assertEqual(index.nearest(query, 8)[:2], (5, hashes[42]))
+        self.assertIsNone(index.nearest(query, 4))
+        self.assertEqual(len(index), 2000)
+
+
+if __name__ == '__main__':
+    unittest.main()
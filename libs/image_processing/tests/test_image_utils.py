@@ -2,8 +2,13 @@
 
 import unittest
 import os
-from PIL import Image
-from image_processing.image_utils import ImageProcessor
+from PIL import Image, ImageChops
+from image_processing.image_utils import (
+    ImageProcessor,
+    draft_request,
+    plan_operations,
+    watermark_mask,
+)
 
 class TestImageProcessor(unittest.TestCase):
 
@@ -48,10 +53,23 @@ class TestImageProcessor(unittest.TestCase):
         self.assertEqual(processor.image.mode, "L")
 
     def test_apply_sepia(self):
-        # This is a bit harder to test precisely, so we'll just check if it runs without error
         processor = ImageProcessor(self.test_image_path)
         processor.apply_sepia()
-        self.assertIsNotNone(processor.image)
+        self.assertEqual(processor.image.mode, "RGB")
+        # Pure red: 0.393 * 255, 0.349 * 255, 0.272 * 255, rounded.
+        self.assertEqual(processor.image.getpixel((0, 0)), (100, 89, 69))
+
+    def test_apply_sepia_clamps_and_keeps_alpha(self):
+        Image.new("RGBA", (10, 10), (255, 255, 255, 40)).save(self.test_image_path)
+        processor = ImageProcessor(self.test_image_path)
+        processor.apply_sepia()
+        self.assertEqual(processor.image.mode, "RGBA")
+        self.assertEqual(processor.image.getpixel((0, 0)), (255, 255, 239, 40))
+
+    def test_apply_sepia_to_grayscale(self):
+        processor = ImageProcessor(self.test_image_path)
+        processor.apply_grayscale().apply_sepia()
+        self.assertEqual(processor.image.mode, "RGB")
 
     def test_add_watermark(self):
         # Also hard to test precisely, so we'll just check if it runs without error
@@ -59,5 +77,72 @@ class TestImageProcessor(unittest.TestCase):
         processor.add_watermark("test")
         self.assertIsNotNone(processor.image)
 
+    def test_plan_operations_downscales_first_and_groups_filters(self):
+        plan = plan_operations([
+            ("filter", "grayscale"),
+            ("resize", (80, 60), 2.0),
+            ("filter", "sepia"),
+            ("resize", (50, 90), 3.0),
+            ("watermark", "x"),
+            ("filter", "sepia"),
+        ])
+        self.assertEqual(plan, [
+            ("resize", (50, 60), 3.0),
+            ("filter", ("grayscale", "sepia")),
+            ("watermark", "x"),
+            ("filter", ("sepia",)),
+        ])
+
+    def test_lazy_pipeline_matches_eager(self):
+        Image.linear_gradient("L").convert("RGB").save(self.test_image_path)
+        eager = ImageProcessor(self.test_image_path)
+        lazy = ImageProcessor(self.test_image_path, lazy=True)
+        for processor in (eager, lazy):
+            processor.apply_grayscale().apply_sepia().resize(max_size=(64, 64))
+        self.assertEqual(len(lazy._pending), 3)
+        self.assertEqual(lazy.image.size, eager.image.size)
+        self.assertEqual(lazy.image.mode, "RGB")
+        for (low, high) in ImageChops.difference(eager.image, lazy.image).getextrema():
+            self.assertLessEqual(high, 2)
+
+    def test_lazy_pipeline_runs_on_save(self):
+        processor = ImageProcessor(self.test_image_path, lazy=True)
+        processor.resize(max_size=(10, 10)).apply_grayscale()
+        processor.save(self.output_path)
+        with Image.open(self.output_path) as saved:
+            self.assertEqual((saved.size, saved.mode), ((10, 10), "L"))
+
+    def test_resize_decodes_jpeg_at_reduced_scale(self):
+        jpeg_path = "test_image.jpg"
+        Image.linear_gradient("L").resize((1600, 1200)).convert("RGB").save(jpeg_path)
+        try:
+            processor = ImageProcessor(jpeg_path, lazy=True)
+            processor.resize(max_size=(100, 100)).apply_grayscale().apply_sepia()
+            plan = plan_operations(processor._pending)
+            self.assertEqual(draft_request(plan), ("L", (200, 200)))
+            self.assertEqual(processor.image.size, (100, 75))
+            self.assertEqual(processor.image.mode, "RGB")
+        finally:
+            os.remove(jpeg_path)
+
+    def test_watermark_respects_opacity_and_is_cached(self):
+        Image.new("RGB", (200, 100), "black").save(self.test_image_path)
+        watermark_mask.cache_clear()
+        for _ in range(2):
+            processor = ImageProcessor(self.test_image_path)
+            processor.add_watermark("MARK", opacity=128)
+        self.assertEqual(watermark_mask.cache_info().hits, 1)
+        brightest = processor.image.getchannel("R").getextrema()[1]
+        self.assertTrue(100 < brightest < 160)
+
+    def test_watermark_composites_onto_transparent_images(self):
+        Image.new("RGBA", (200, 100), (0, 0, 0, 0)).save(self.test_image_path)
+        processor = ImageProcessor(self.test_image_path)
+        processor.add_watermark("MARK", opacity=255)
+        image = processor.image
+        self.assertEqual(image.mode, "RGBA")
+        self.assertGreater(image.getchannel("A").getextrema()[1], 200)
+        self.assertEqual(image.getpixel((0, 0)), (0, 0, 0, 0))
+
 if __name__ == '__main__':
     unittest.main()
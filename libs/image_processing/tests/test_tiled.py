@@ -0,0 +1,70 @@
+# libs/image_processing/tests/test_tiled.py
+
+import os
+import unittest
+
+from PIL import Image, ImageChops
+from image_processing.image_utils import ImageProcessor, SEPIA_MATRIX, apply_color_matrix
+from image_processing.tiled import (
+    FILTER_SCRATCH_BYTES,
+    MemoryLimitError,
+    image_bytes,
+    map_strips,
+    plan_strips,
+)
+
+
+class TestTiled(unittest.TestCase):
+
+    def setUp(self):
+        self.image = Image.linear_gradient("L").resize((300, 200)).convert("RGB")
+        self.image_path = "test_tiled.png"
+
+    def tearDown(self):
+        if os.path.exists(self.image_path):
+            os.remove(self.image_path)
+
+    def test_image_bytes_uses_pillow_pixel_sizes(self):
+        self.assertEqual(image_bytes("RGB", (10, 10)), 400)
+        self.assertEqual(image_bytes("L", (10, 10)), 100)
+
+    def test_plan_strips_fits_the_limit(self):
+        fixed = image_bytes("RGB", (300, 200))
+        plan = plan_strips((300, 200), fixed, fixed + 10 * 300 * FILTER_SCRATCH_BYTES)
+        self.assertEqual((plan.strip_height, plan.strips), (10, 20))
+        self.assertEqual(plan.peak_bytes, fixed + 10 * 300 * FILTER_SCRATCH_BYTES)
+        with self.assertRaises(MemoryLimitError):
+            plan_strips((300, 200), fixed, fixed)
+
+    def test_map_strips_matches_whole_image(self):
+        expected = apply_color_matrix(self.image, SEPIA_MATRIX)
+        limit = image_bytes("RGB", self.image.size) + 7 * 300 * FILTER_SCRATCH_BYTES
+        result, plan = map_strips(
+            self.image.copy(), lambda strip: apply_color_matrix(strip, SEPIA_MATRIX), "RGB", limit
+        )
+        self.assertEqual(plan.strips, 29)
+        self.assertIsNone(ImageChops.difference(expected, result).getbbox())
+
+    def test_processor_filters_in_strips_under_a_limit(self):
+        self.image.save(self.image_path)
+        limit = image_bytes("RGB", self.image.size) + 2**16
+        processor = ImageProcessor(self.image_path, memory_limit=limit)
+        processor.apply_sepia()
+        self.assertEqual(processor.image.mode, "RGB")
+        self.assertLessEqual(processor.peak_memory, limit)
+
+        unlimited = ImageProcessor(self.image_path)
+        unlimited.apply_sepia()
+        self.assertIsNone(ImageChops.difference(processor.image, unlimited.image).getbbox())
+        self.assertGreater(unlimited.peak_memory, limit)
+
+    def test_processor_refuses_images_over_the_limit_before_decoding(self):
+        self.image.save(self.image_path)
+        processor = ImageProcessor(self.image_path, lazy=True, memory_limit=1000)
+        processor.apply_sepia()
+        with self.assertRaises(MemoryLimitError):
+            processor.image
+
+
+if __name__ == '__main__':
+    unittest.main()